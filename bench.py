@@ -0,0 +1,225 @@
+# bench.py
+
+'''
+Repeatable benchmark suite for the lab graphs.
+
+Every benchmark runs on a graph from generators.py of a given shape, size
+and average degree (same seed, same graph), is warmed up, and then timed
+over repeated trials with time.perf_counter_ns(). Results are reported as
+percentiles per trial rather than a single wall clock reading:
+
+    python bench.py --graph ba --nodes 5000 --degree 8 --json results.json
+    python bench.py --compare results.json       # exits 1 on a regression
+
+A comparison flags a benchmark when its median is more than --threshold
+(default 10%) slower than in the baseline file. Both runs should use the
+same graph parameters; compare warns when they differ.
+
+Benchmarks:
+
+    import     Graph.importFromFile on a generated DOT file (ex2.py)
+    sssp       Graph.fastSP from a fixed set of sources (ex2.py)
+    mst        minimum_spanning_tree, Kruskal (mst.py, behind ex3.Graph.mst)
+    dfs        Graph.dfs and Graph2.dfs (ex4.py)
+    toposort   DiGraph.toposort on a random DAG (digraph.py)
+    mutations  removeEdge + addEdge pairs on Graph (ex2.py)
+'''
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from digraph import DiGraph
+from ex2 import Graph, GraphNode
+from ex4 import Graph as ListGraph, Graph2 as MatrixGraph
+from generators import barabasi_albert, edge_probability, erdos_renyi, grid, populate, random_dag, write_dot
+from mst import minimum_spanning_tree
+
+PERCENTILES = (50, 90, 99)
+GRAPHS = ('er', 'ba', 'grid')
+
+
+def percentile(sorted_values, p):
+    '''p-th percentile of an ascending list, interpolating between ranks.'''
+    k = (len(sorted_values) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+def measure(run, setup=None, warmup=2, repeat=10, ops=1):
+    '''
+    Times run() over repeat trials after warmup untimed calls. setup(), if
+    given, is called untimed before every call and its result is passed to
+    run. ops is the number of operations one call performs; it is recorded
+    so per-operation costs can be derived.
+
+    Returns:
+        dict with the sorted trial times in ns ("trials_ns"), "min_ns",
+        "mean_ns", "pNN_ns" for each of PERCENTILES, and "ops".'''
+    perf_counter_ns = time.perf_counter_ns
+    trials = []
+    for trial in range(warmup + repeat):
+        if setup is None:
+            start = perf_counter_ns()
+            run()
+        else:
+            state = setup()
+            start = perf_counter_ns()
+            run(state)
+        elapsed = perf_counter_ns() - start
+        if trial >= warmup:
+            trials.append(elapsed)
+    trials.sort()
+    result = {"ops": ops, "min_ns": trials[0], "mean_ns": sum(trials) / len(trials)}
+    for p in PERCENTILES:
+        result[f"p{p}_ns"] = percentile(trials, p)
+    result["trials_ns"] = trials
+    return result
+
+
+def generate(kind, nodes, degree, seed):
+    '''Edge list of a generated graph (see generators.py) with about the given average degree.'''
+    if kind == "er":
+        return list(erdos_renyi(nodes, edge_probability(nodes, degree), seed))
+    if kind == "ba":
+        return list(barabasi_albert(nodes, max(1, round(degree / 2)), seed))
+    if kind == "grid":
+        side = max(1, round(math.sqrt(nodes)))
+        return list(grid(side, side, min(1.0, degree / 4), seed))
+    raise ValueError(f"unknown graph kind {kind!r}, expected one of {GRAPHS}")
+
+
+def run_suite(nodes, degree, seed=338, warmup=2, repeat=10, only=None, sources=5, churn=1000, kind='er'):
+    '''Runs the selected benchmarks (all by default); returns {name: result}.'''
+    edges = generate(kind, nodes, degree, seed)
+    rng = random.Random(seed)
+    results = {}
+
+    def wanted(name):
+        return only is None or name in only
+
+    fd, dot_file = tempfile.mkstemp(suffix=".dot")
+    os.close(fd)
+    try:
+        write_dot(edges, dot_file)
+        graph = Graph()
+        graph.importFromFile(dot_file)
+        labels = list(graph.adjacency_list)
+
+        if wanted("import"):
+            results["import"] = measure(lambda: Graph().importFromFile(dot_file), warmup=warmup,
+                                        repeat=repeat, ops=len(edges))
+        if wanted("sssp"):
+            starts = [GraphNode(label) for label in rng.sample(labels, min(sources, len(labels)))]
+            results["sssp"] = measure(lambda: [graph.fastSP(node) for node in starts], warmup=warmup,
+                                      repeat=repeat, ops=len(starts))
+        if wanted("mst"):
+            results["mst"] = measure(lambda: minimum_spanning_tree(graph.adjacency_list, 'kruskal'),
+                                     warmup=warmup, repeat=repeat)
+        if wanted("dfs"):
+            list_graph, matrix_graph = ListGraph(), MatrixGraph()
+            list_graph.importFromFile(dot_file)
+            matrix_graph.importFromFile(dot_file)
+            results["dfs.list"] = measure(lambda: list_graph.dfs(labels[0]), warmup=warmup, repeat=repeat)
+            results["dfs.matrix"] = measure(lambda: matrix_graph.dfs(labels[0]), warmup=warmup, repeat=repeat)
+        if wanted("toposort"):
+            dag = populate(DiGraph(), random_dag(nodes, edge_probability(nodes, degree), seed), range(nodes))
+            results["toposort"] = measure(dag.toposort, warmup=warmup, repeat=repeat)
+        if wanted("mutations") and edges:
+            # labels read back from the DOT file are strings
+            picks = [(str(u), str(v), weight) for u, v, weight in
+                     (edges[rng.randrange(len(edges))] for _ in range(churn))]
+
+            def churn_run():
+                for u, v, weight in picks:
+                    graph.removeEdge(GraphNode(u), GraphNode(v))
+                    graph.addEdge(GraphNode(u), GraphNode(v), weight)
+            results["mutations"] = measure(churn_run, warmup=warmup, repeat=repeat, ops=len(picks))
+    finally:
+        os.remove(dot_file)
+    return results
+
+
+def compare(results, baseline, threshold=0.10):
+    '''
+    Compares medians against a baseline results dict. Returns a list of
+    (name, baseline_ns, current_ns, ratio, regressed) rows for every
+    benchmark present in both.'''
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["p50_ns"], result["p50_ns"]
+        ratio = after / before if before else float('inf')
+        rows.append((name, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:8.2f} {unit}"
+    return f"{ns:8.0f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--degree", type=int, default=8, help="average degree")
+    parser.add_argument("--graph", choices=GRAPHS, default="er",
+                        help="Erdős-Rényi, Barabási-Albert or road-like grid (see generators.py)")
+    parser.add_argument("--seed", type=int, default=338)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", nargs="+", metavar="NAME",
+                        help="subset of: import sssp mst dfs toposort mutations")
+    parser.add_argument("--json", metavar="FILE", help="write results to FILE")
+    parser.add_argument("--compare", metavar="FILE", help="baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative median slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    meta = {
+        "graph": args.graph, "nodes": args.nodes, "degree": args.degree, "seed": args.seed,
+        "warmup": args.warmup, "repeat": args.repeat,
+        "python": platform.python_version(), "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    results = run_suite(args.nodes, args.degree, args.seed, args.warmup, args.repeat, args.only, kind=args.graph)
+
+    print(f"{args.graph}: {args.nodes} nodes, average degree {args.degree}, {args.repeat} trials after {args.warmup} warmups")
+    print(f"{'benchmark':>12} {'min':>11} {'p50':>11} {'p90':>11} {'p99':>11} {'p50/op':>11}")
+    for name, result in results.items():
+        print(f"{name:>12} {_format_ns(result['min_ns'])} {_format_ns(result['p50_ns'])} "
+              f"{_format_ns(result['p90_ns'])} {_format_ns(result['p99_ns'])} "
+              f"{_format_ns(result['p50_ns'] / result['ops'])}")
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump({"meta": meta, "results": results}, out, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for key in ("graph", "nodes", "degree", "seed"):
+            if baseline["meta"].get(key) != meta[key]:
+                print(f"warning: baseline {key}={baseline['meta'].get(key)}, this run {key}={meta[key]}")
+        regressions = 0
+        print(f"\ncompared with {args.compare} (threshold {args.threshold:.0%}):")
+        for name, before, after, ratio, regressed in compare(results, baseline["results"], args.threshold):
+            regressions += regressed
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:>12} {_format_ns(before)} -> {_format_ns(after)}  {ratio:5.2f}x  {flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+# bitmatrix.py
+
+'''
+Dense adjacency matrix backend for Graph2 (ex4.py).
+
+Graph2 calls itself an adjacency matrix but stores a dict of dicts.
+DenseGraph2 has the same interface and is a real matrix:
+
+    rows[i]   Python int used as a bitset; bit j set <=> edge i - j
+    weights   flat int64 array, weights[i * capacity + j] (float64 once a
+              non-integer weight is added)
+
+Node labels map to row ids; ids of removed nodes are reused. Edge tests are
+a shift and a mask, and traversals expand whole rows at once: a BFS step
+ORs the rows of the entire frontier together, and a DFS step finds the next
+unvisited neighbor with `row & ~visited`. Those bitwise operations run over
+machine words inside CPython, 64 nodes at a time. Topology takes V^2/8
+bytes, weights 8 * V^2.
+'''
+
+from array import array
+
+from dotio import iter_dot_edges
+# ex4 imports this module, so GraphNode comes from ex1 (the same class)
+from ex1 import GraphNode
+
+
+def _bits(mask):
+    # ids of the set bits of mask, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class DenseGraph2:
+    def __init__(self, capacity=8):
+        self.labels = []       # id -> label (None for a free id)
+        self.index = {}        # label -> id
+        self.free = []
+        self.rows = []
+        self.alive = 0         # bitset of ids in use
+        self.capacity = capacity
+        self.weights = array('q', bytes(8 * capacity * capacity))
+
+    # ---- storage ----
+
+    def _grow(self):
+        old, cap = self.weights, self.capacity
+        new_cap = max(8, 2 * cap)
+        weights = array(old.typecode, bytes(8 * new_cap * new_cap))
+        for i in range(cap):
+            weights[i * new_cap:i * new_cap + cap] = old[i * cap:(i + 1) * cap]
+        self.weights, self.capacity = weights, new_cap
+
+    def _store(self, k, weight):
+        try:
+            self.weights[k] = weight
+        except (TypeError, OverflowError):
+            # first non-integer (or beyond int64) weight: switch to float64,
+            # like csr._weight_array
+            self.weights = array('d', self.weights)
+            self.weights[k] = weight
+
+    def _ids(self, n1, n2):
+        i, j = self.index.get(n1.data), self.index.get(n2.data)
+        if i is None or j is None:
+            return None
+        return i, j
+
+    # ---- Graph2 interface ----
+
+    def addNode(self, data):
+        if data in self.index:
+            return None
+        if self.free:
+            i = self.free.pop()
+            self.labels[i] = data
+        else:
+            i = len(self.labels)
+            if i == self.capacity:
+                self._grow()
+            self.labels.append(data)
+            self.rows.append(0)
+        self.index[data] = i
+        self.alive |= 1 << i
+        return GraphNode(data)
+
+    def removeNode(self, node):
+        i = self.index.pop(node.data, None)
+        if i is None:
+            return
+        clear = ~(1 << i)
+        for j in _bits(self.rows[i]):
+            self.rows[j] &= clear
+        self.rows[i] = 0
+        self.alive &= clear
+        self.labels[i] = None
+        self.free.append(i)
+
+    def addEdge(self, n1, n2, weight=1):
+        ids = self._ids(n1, n2)
+        if ids is None:
+            return
+        i, j = ids
+        self.rows[i] |= 1 << j
+        self.rows[j] |= 1 << i
+        self._store(i * self.capacity + j, weight)
+        self._store(j * self.capacity + i, weight)
+
+    def removeEdge(self, n1, n2):
+        '''Like Graph2.removeEdge: KeyError if both nodes exist but the edge does not.'''
+        ids = self._ids(n1, n2)
+        if ids is None:
+            return
+        i, j = ids
+        if not (self.rows[i] >> j) & 1:
+            raise KeyError(n2.data)
+        self.rows[i] &= ~(1 << j)
+        self.rows[j] &= ~(1 << i)
+
+    def hasEdge(self, n1, n2):
+        index = self.index
+        i, j = index.get(n1.data), index.get(n2.data)
+        return i is not None and j is not None and self.rows[i] >> j & 1 == 1
+
+    def weight(self, n1, n2):
+        ids = self._ids(n1, n2)
+        if ids is None:
+            raise KeyError((n1.data, n2.data))
+        i, j = ids
+        if not (self.rows[i] >> j) & 1:
+            raise KeyError((n1.data, n2.data))
+        return self.weights[i * self.capacity + j]
+
+    def neighbors(self, data):
+        '''Neighbor labels of a node, in row id order.'''
+        labels = self.labels
+        return [labels[j] for j in _bits(self.rows[self.index[data]])]
+
+    def printGraph(self):
+        cap = self.capacity
+        for i in _bits(self.alive):
+            print(f"Node {self.labels[i]} connects to:")
+            for j in _bits(self.rows[i]):
+                print(f"  {self.labels[j]} with weight {self.weights[i * cap + j]}\n")
+
+    def importFromFile(self, file):
+        '''
+        Streams a "strict graph" DOT file into the matrix, replacing its
+        contents. Raises DotParseError on malformed input.'''
+        graph = DenseGraph2(self.capacity)
+        for node1, node2, weight in iter_dot_edges(file):
+            graph.addNode(node1)
+            graph.addNode(node2)
+            graph.addEdge(GraphNode(node1), GraphNode(node2), weight)
+        self.__dict__.update(graph.__dict__)
+
+    # ---- traversals ----
+
+    def dfs(self, start):
+        '''Pre-order DFS; neighbors are taken in row id order.'''
+        rows, labels = self.rows, self.labels
+        s = self.index[start]
+        visited = 1 << s
+        order = [start]
+        stack = [s]
+        while stack:
+            candidates = rows[stack[-1]] & ~visited
+            if not candidates:
+                stack.pop()
+                continue
+            j = (candidates & -candidates).bit_length() - 1
+            visited |= 1 << j
+            order.append(labels[j])
+            stack.append(j)
+        return order
+
+    def bfs_levels(self, start):
+        '''Yields the BFS frontier of each level as a list of labels.'''
+        rows, labels = self.rows, self.labels
+        frontier = visited = 1 << self.index[start]
+        while frontier:
+            yield [labels[i] for i in _bits(frontier)]
+            reached = 0
+            for i in _bits(frontier):
+                reached |= rows[i]
+            frontier = reached & ~visited
+            visited |= frontier
+
+    def bfs(self, start):
+        '''BFS order from start (level by level, row id order within a level).'''
+        return [label for level in self.bfs_levels(start) for label in level]
+
+    def reachable(self, start):
+        '''Set of labels reachable from start.'''
+        rows = self.rows
+        frontier = visited = 1 << self.index[start]
+        while frontier:
+            reached = 0
+            for i in _bits(frontier):
+                reached |= rows[i]
+            frontier = reached & ~visited
+            visited |= frontier
+        return {self.labels[i] for i in _bits(visited)}
+
+    @classmethod
+    def from_graph2(cls, graph):
+        '''Copies a dict based Graph2 (or anything with adjacency_matrix).'''
+        dense = cls(max(8, len(graph.adjacency_matrix)))
+        for label in graph.adjacency_matrix:
+            dense.addNode(label)
+        cap, index, rows = dense.capacity, dense.index, dense.rows
+        for label, connections in graph.adjacency_matrix.items():
+            i = index[label]
+            row = 0
+            for neighbor, weight in connections.items():
+                j = index[neighbor]
+                row |= 1 << j
+                dense._store(i * cap + j, weight)
+            rows[i] = row
+        return dense
+
+
+# Dense graph comparison against the dict based Graph2: python bitmatrix.py [n] [p]
+if __name__ == "__main__":
+    import random
+    import sys
+    import timeit
+
+    from ex4 import Graph2, GraphNode as Node
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    p = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    random.seed(338)
+    sparse = Graph2()
+    for i in range(n):
+        sparse.addNode(i)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if random.random() < p:
+                sparse.addEdge(Node(i), Node(j), random.randint(1, 100))
+    dense = DenseGraph2.from_graph2(sparse)
+    assert sorted(dense.dfs(0)) == sorted(sparse.dfs(0))
+
+    # same missing-edge behaviour as Graph2; weights past int64 fall back to float64
+    small = DenseGraph2()
+    a, b = small.addNode('a'), small.addNode('b')
+    for graph in (small, Graph2()):
+        graph.addNode('a')
+        graph.addNode('b')
+        try:
+            graph.removeEdge(a, b)
+        except KeyError:
+            pass
+        else:
+            raise AssertionError(f"{type(graph).__name__}.removeEdge ignored a missing edge")
+    small.addEdge(a, b, 2 ** 70)
+    assert small.weight(a, b) == 2.0 ** 70
+
+    probes = [(Node(random.randrange(n)), Node(random.randrange(n))) for _ in range(10000)]
+    cases = [
+        ("dfs", lambda: sparse.dfs(0), lambda: dense.dfs(0)),
+        ("reachability", lambda: set(sparse.dfs(0)), lambda: dense.reachable(0)),
+        ("10k edge tests", lambda: [b.data in sparse.adjacency_matrix[a.data] for a, b in probes],
+         lambda: [dense.hasEdge(a, b) for a, b in probes]),
+    ]
+    print(f"{n} nodes, edge probability {p}")
+    for name, dict_run, dense_run in cases:
+        t_dict = min(timeit.repeat(dict_run, number=1, repeat=5))
+        t_dense = min(timeit.repeat(dense_run, number=1, repeat=5))
+        print(f"{name:>15}: dict {t_dict * 1000:8.2f} ms  bitset {t_dense * 1000:8.2f} ms")
@@ -0,0 +1,296 @@
+# ch.py
+
+'''
+Contraction hierarchy (CH) index for repeated point-to-point queries on a
+mostly static undirected graph.
+
+Preprocessing contracts nodes one at a time in order of importance
+(edge difference + number of already contracted neighbors, updated
+lazily). Contracting v removes it from the remaining graph; for every pair
+of its remaining neighbors u, x whose shortest connection runs through v
+(no "witness" path of equal or smaller length exists) a shortcut u - x is
+added. Every edge ends up stored once, at its lower ranked endpoint,
+pointing upward; that upward graph is frozen into CSR arrays.
+
+The edge difference is estimated cheaply: the witness searches behind a
+priority stop after a few hops (missing a witness only overestimates the
+shortcuts), and the estimate is cached until one of the node's neighbors
+is contracted. Only the actual contraction searches without a hop limit.
+
+A query runs Dijkstra upward from both endpoints and takes the best node
+where the two searches meet. Both searches only see a tiny part of the
+graph, which is what makes queries fast.
+'''
+
+from array import array
+import heapq
+import pickle
+
+from csr import CSRGraph
+
+FORMAT_VERSION = 1
+
+
+def _witness_search(adj, source, excluded, targets, bound, max_settled, max_hops=None):
+    # bounded Dijkstra in the remaining graph that ignores the node being
+    # contracted, stopping once every target is settled; returns tentative
+    # distances (good enough as upper bounds)
+    inf = float('inf')
+    dist = {source: 0}
+    heap = [(0, source, 0)]
+    settled = set()
+    left = len(targets)
+    while heap and len(settled) < max_settled:
+        d, u, hops = heapq.heappop(heap)
+        if d > dist[u] or u in settled:
+            continue
+        settled.add(u)
+        if u in targets:
+            left -= 1
+            if not left:
+                break
+        if hops == max_hops:
+            continue
+        hops += 1
+        for v, (w, _) in adj[u].items():
+            alt = d + w
+            if alt <= bound and alt < dist.get(v, inf) and v != excluded:
+                dist[v] = alt
+                heapq.heappush(heap, (alt, v, hops))
+    return dist
+
+
+class ContractionHierarchy:
+    def __init__(self, labels, rank, offsets, targets, weights, middle):
+        self.labels = labels
+        self.index = {label: i for i, label in enumerate(labels)}
+        self.rank = rank
+        # upward graph: CSR rows hold the edges from a node to higher ranked
+        # nodes; middle[k] is the contracted node a shortcut bypasses (-1 for
+        # an original edge)
+        self.up = CSRGraph(labels, offsets, targets, weights, directed=True)
+        self.middle = middle
+
+    # ---- preprocessing ----
+
+    @classmethod
+    def build(cls, graph, max_settled=64, max_hops=3):
+        '''
+        Contracts every node of graph (a CSRGraph or any lab graph with an
+        adjacency_list). max_settled caps each witness search, and max_hops
+        additionally caps the ones that only estimate priorities; smaller
+        caps build faster but may add a few unnecessary shortcuts.'''
+        if not isinstance(graph, CSRGraph):
+            graph = CSRGraph.from_graph(graph)
+        n = len(graph.labels)
+        adj = [dict() for _ in range(n)]
+        for u in range(n):
+            for v, w in graph.neighbors(u):
+                if v != u and (v not in adj[u] or w < adj[u][v][0]):
+                    adj[u][v] = (w, -1)
+                    adj[v][u] = (w, -1)
+
+        def shortcuts(v, max_hops=None):
+            # (u, x, length through v) for the pairs of v's neighbors the
+            # witness searches find no shorter way around v for
+            neighbors = list(adj[v].items())
+            found = []
+            for i, (u, (wu, _)) in enumerate(neighbors):
+                rest = neighbors[i + 1:]
+                if not rest:
+                    continue
+                bound = wu + max(wx for _, (wx, _) in rest)
+                witness = _witness_search(adj, u, v, {x for x, _ in rest}, bound, max_settled, max_hops)
+                for x, (wx, _) in rest:
+                    need = wu + wx
+                    if witness.get(x, float('inf')) > need:
+                        found.append((u, x, need))
+            return found
+
+        contracted_neighbors = [0] * n
+        simulated = {}   # v -> hop limited shortcut count, until a neighbor of v is contracted
+
+        def priority(v):
+            count = simulated.get(v)
+            if count is None:
+                count = simulated[v] = len(shortcuts(v, max_hops))
+            return count - len(adj[v]) + contracted_neighbors[v]
+
+        heap = [(priority(v), v) for v in range(n)]
+        heapq.heapify(heap)
+        rank = array('i', bytes(4 * n))
+        up_rows = [None] * n
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            if up_rows[v] is not None:
+                continue
+            # lazy update: re-queue if v is no longer the cheapest node
+            current = priority(v)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, v))
+                continue
+            for u, x, need in shortcuts(v):
+                if x not in adj[u] or need < adj[u][x][0]:
+                    adj[u][x] = (need, v)
+                    adj[x][u] = (need, v)
+            up_rows[v] = list(adj[v].items())
+            for u in adj[v]:
+                del adj[u][v]
+                contracted_neighbors[u] += 1
+                simulated.pop(u, None)
+            simulated.pop(v, None)
+            adj[v] = {}
+            rank[v] = order
+            order += 1
+
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array(getattr(graph.weights, 'typecode', None) or graph.weights.format)
+        middle = array('i')
+        for v in range(n):
+            for u, (w, mid) in up_rows[v]:
+                targets.append(u)
+                weights.append(w)
+                middle.append(mid)
+            offsets.append(len(targets))
+        return cls(list(graph.labels), rank, offsets, targets, weights, middle)
+
+    # ---- persistence ----
+
+    def save(self, path):
+        up = self.up
+        with open(path, 'wb') as f:
+            pickle.dump((FORMAT_VERSION, self.labels, self.rank, up.offsets, up.targets,
+                         up.weights, self.middle), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            version, *state = pickle.load(f)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported contraction hierarchy version {version}")
+        return cls(*state)
+
+    # ---- queries ----
+
+    def _search(self, s, t):
+        offsets, targets, weights = self.up.offsets, self.up.targets, self.up.weights
+        inf = float('inf')
+        dist = ({s: 0}, {t: 0})
+        parent = ({s: None}, {t: None})
+        heaps = ([(0, s)], [(0, t)])
+        best, meeting = (0, s) if s == t else (inf, -1)
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                heap = heaps[side]
+                if not heap:
+                    continue
+                d, u = heapq.heappop(heap)
+                if d >= best:
+                    # nothing left on this side can improve the answer
+                    heap.clear()
+                    continue
+                if d > dist[side][u]:
+                    continue
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < best:
+                    best, meeting = d + other, u
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    alt = d + weights[k]
+                    if alt < dist[side].get(v, inf):
+                        dist[side][v] = alt
+                        parent[side][v] = (u, k)
+                        heapq.heappush(heap, (alt, v))
+        return best, meeting, parent
+
+    def distance(self, source, target):
+        '''Shortest distance between two labels (inf if unreachable).'''
+        best, _, _ = self._search(self.index[source], self.index[target])
+        return best
+
+    def path(self, source, target):
+        '''(distance, list of labels on a shortest path); [] if unreachable.'''
+        s, t = self.index[source], self.index[target]
+        best, meeting, parent = self._search(s, t)
+        if meeting == -1:
+            return best, []
+        # climb both upward trees from the meeting node back to s and t
+        chains = []
+        for side in (0, 1):
+            chain = []
+            node = meeting
+            while parent[side][node] is not None:
+                low, k = parent[side][node]
+                chain.append((low, node, k))
+                node = low
+            chains.append(chain)
+        forward = [(low, high, k) for low, high, k in reversed(chains[0])]
+        backward = [(high, low, k) for low, high, k in chains[1]]
+
+        ids = [s]
+        for a, b, k in forward + backward:
+            ids.extend(self._unpack(a, b, k)[1:])
+        return best, [self.labels[i] for i in ids]
+
+    def _edge(self, a, b):
+        # position of the upward edge between a and b (stored at the lower rank)
+        low, high = (a, b) if self.rank[a] < self.rank[b] else (b, a)
+        offsets, targets = self.up.offsets, self.up.targets
+        for k in range(offsets[low], offsets[low + 1]):
+            if targets[k] == high:
+                return k
+        raise KeyError((a, b))
+
+    def _unpack(self, a, b, k):
+        # expand edge k between a and b into the original path a .. b
+        path = [a]
+        stack = [(a, b, k)]
+        while stack:
+            x, y, k = stack.pop()
+            m = self.middle[k]
+            if m == -1:
+                path.append(y)
+            else:
+                stack.append((m, y, self._edge(m, y)))
+                stack.append((x, m, self._edge(x, m)))
+        return path
+
+
+# Query latency check: python ch.py
+if __name__ == "__main__":
+    import random
+    import time
+
+    graph = CSRGraph.from_file("random.dot")
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(graph)
+    print(f"preprocessing: {time.perf_counter() - start:.2f} s, "
+          f"{len(hierarchy.up.targets) - graph.num_edges()} shortcuts")
+
+    random.seed(338)
+    pairs = [(random.choice(graph.labels), random.choice(graph.labels)) for _ in range(500)]
+    start = time.perf_counter()
+    expected = [graph.fastSP(s)[t] for s, t in pairs]
+    dijkstra_time = (time.perf_counter() - start) / len(pairs)
+    start = time.perf_counter()
+    answers = [hierarchy.distance(s, t) for s, t in pairs]
+    ch_time = (time.perf_counter() - start) / len(pairs)
+    assert answers == expected
+
+    # paths unpack into original edges and add up to fastSP's distance
+    edge_weight = {}
+    for u in range(len(graph.labels)):
+        for v, w in graph.neighbors(u):
+            key = (graph.labels[u], graph.labels[v])
+            edge_weight[key] = min(w, edge_weight.get(key, w))
+    for (s, t), distance in zip(pairs, expected):
+        best, labels = hierarchy.path(s, t)
+        if distance == float('inf'):
+            assert labels == [], (s, t)
+            continue
+        assert best == distance and labels[0] == s and labels[-1] == t, (s, t)
+        assert sum(edge_weight[a, b] for a, b in zip(labels, labels[1:])) == distance, (s, t)
+    print(f"fastSP: {dijkstra_time * 1e6:8.1f} us/query")
+    print(f"CH:     {ch_time * 1e6:8.1f} us/query")
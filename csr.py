@@ -0,0 +1,345 @@
+# csr.py
+
+'''
+Compressed-sparse-row (CSR) storage for the lab graphs.
+
+The Graph classes in ex1.py - ex5.py keep a dict of Python lists of
+(neighbor, weight) tuples keyed by label. CSRGraph freezes the same graph
+into three flat typed arrays:
+
+    offsets[i] .. offsets[i + 1]   slice of targets/weights owned by node i
+    targets                        neighbor ids (int32)
+    weights                        edge weights (int64, or float64 if needed)
+
+Labels are mapped to dense integer ids once; every algorithm below runs on
+the ids and only converts back to labels when building its result, so the
+results look exactly like the ones produced by the dict based Graph.
+'''
+
+from array import array
+from collections.abc import Mapping
+import heapq
+
+from dotio import iter_dot_edges
+
+
+def _label(node):
+    # accept GraphNode objects (like the Graph classes do) or raw labels
+    return getattr(node, 'data', node)
+
+
+def _weight_array(weights):
+    try:
+        return array('q', weights)
+    except TypeError:
+        return array('d', weights)
+
+
+class _AdjacencyView(Mapping):
+    '''Read-only adjacency_list look-alike so code written against the dict
+    based Graph (printGraph style loops, helper functions) keeps working.'''
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, label):
+        g = self._graph
+        i = g.index[label]
+        labels = g.labels
+        start, end = g.offsets[i], g.offsets[i + 1]
+        return [(labels[g.targets[k]], g.weights[k]) for k in range(start, end)]
+
+    def __iter__(self):
+        return iter(self._graph.labels)
+
+    def __len__(self):
+        return len(self._graph.labels)
+
+    def __contains__(self, label):
+        return label in self._graph.index
+
+
+class CSRGraph:
+    def __init__(self, labels, offsets, targets, weights, directed=False, index=None):
+        '''
+        Wraps already built CSR buffers. Any buffer supporting indexing works
+        (array.array, memoryview, numpy arrays), which lets other modules back
+        a CSRGraph with mmap'ed or shared memory. index is an optional
+        label -> id mapping; when it is given, labels is kept as is (any
+        sequence), so both can be lazy views instead of a list and a dict.'''
+        if index is None:
+            self.labels = list(labels)
+            self.index = {label: i for i, label in enumerate(self.labels)}
+        else:
+            self.labels = labels
+            self.index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.directed = directed
+
+    # ---- construction ----
+
+    @classmethod
+    def from_graph(cls, graph):
+        '''
+        Builds a CSRGraph from any of the lab graph classes: anything with an
+        adjacency_list (dict of (neighbor, weight) lists) or an
+        adjacency_matrix (dict of {neighbor: weight} dicts).'''
+        if hasattr(graph, 'adjacency_list'):
+            rows = graph.adjacency_list
+            items = lambda label: rows[label]
+        else:
+            rows = graph.adjacency_matrix
+            items = lambda label: rows[label].items()
+
+        labels = list(rows)
+        index = {label: i for i, label in enumerate(labels)}
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = []
+        for label in labels:
+            for neighbor, weight in items(label):
+                targets.append(index[neighbor])
+                weights.append(weight)
+            offsets.append(len(targets))
+        return cls(labels, offsets, targets, _weight_array(weights),
+                   directed=getattr(graph, 'directed', False))
+
+    @classmethod
+    def from_edges(cls, edges, directed=False):
+        '''
+        Builds a CSRGraph from an iterable of (u, v, weight) label triples
+        without going through the dict based Graph. Edges are buffered in
+        flat arrays and bucketed by source with a counting sort, so peak
+        memory stays at a few machine words per edge.'''
+        index = {}
+        labels = []
+        src = array('i')
+        dst = array('i')
+        wts = array('q')
+        for u, v, weight in edges:
+            for label in (u, v):
+                if label not in index:
+                    index[label] = len(labels)
+                    labels.append(label)
+            if wts.typecode == 'q' and not isinstance(weight, int):
+                wts = array('d', wts)
+            src.append(index[u])
+            dst.append(index[v])
+            wts.append(weight)
+        return cls._from_arrays(labels, src, dst, wts, directed)
+
+    @classmethod
+    def from_file(cls, file, directed=False):
+        '''
+        Streams a "strict graph" DOT file (the format used by random.dot), or
+        a "digraph" one with directed=True, straight into CSR form, without
+        building the dict based Graph first. Raises DotParseError on
+        malformed input.'''
+        return cls.from_edges(iter_dot_edges(file, directed), directed)
+
+    @classmethod
+    def _from_arrays(cls, labels, src, dst, wts, directed):
+        n = len(labels)
+        m = len(src) if directed else 2 * len(src)
+
+        offsets = array('q', bytes(8 * (n + 1)))
+        for u in src:
+            offsets[u + 1] += 1
+        if not directed:
+            for v in dst:
+                offsets[v + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        cursor = array('q', offsets[:n])
+        targets = array('i', bytes(4 * m))
+        weights = array(wts.typecode, bytes(wts.itemsize * m))
+        # fill in input order so neighbor order matches Graph.addEdge
+        for k in range(len(src)):
+            u, v, weight = src[k], dst[k], wts[k]
+            pos = cursor[u]
+            targets[pos] = v
+            weights[pos] = weight
+            cursor[u] = pos + 1
+            if not directed:
+                pos = cursor[v]
+                targets[pos] = u
+                weights[pos] = weight
+                cursor[v] = pos + 1
+        return cls(labels, offsets, targets, weights, directed)
+
+    # ---- Graph-like accessors ----
+
+    @property
+    def adjacency_list(self):
+        return _AdjacencyView(self)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def num_edges(self):
+        # undirected edges are stored once per direction
+        m = self.offsets[len(self.labels)]
+        return m if self.directed else m // 2
+
+    def nbytes(self):
+        '''Bytes held by the CSR arrays (labels and the label index excluded).'''
+        return sum(len(buf) * buf.itemsize
+                   for buf in (self.offsets, self.targets, self.weights))
+
+    def node_id(self, node):
+        return self.index[_label(node)]
+
+    def neighbors(self, i):
+        '''(neighbor_id, weight) pairs of node id i.'''
+        targets, weights = self.targets, self.weights
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            yield targets[k], weights[k]
+
+    def printGraph(self):
+        for node, connections in self.adjacency_list.items():
+            print(f"Node {node} connects to:")
+            for neighbor, weight in connections:
+                print(f"  {neighbor} with weight {weight}\n")
+
+    # ---- algorithms (same results as the dict based Graph) ----
+
+    def fastSP(self, node):
+        '''
+        Dijkstra with a binary heap, as in ex2.py. Returns a dict mapping
+        every label to its distance from node (inf if unreachable).'''
+        return dict(zip(self.labels, self.distances(self.node_id(node))))
+
+    def distances(self, source):
+        '''Dijkstra from node id source; returns a list indexed by node id.'''
+        n = len(self.labels)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        inf = float('inf')
+        dist = [inf] * n
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            curr_dist, u = heapq.heappop(heap)
+            if curr_dist > dist[u]:
+                continue
+            for k in range(offsets[u], offsets[u + 1]):
+                alt = curr_dist + weights[k]
+                v = targets[k]
+                if alt < dist[v]:
+                    dist[v] = alt
+                    heapq.heappush(heap, (alt, v))
+        return dist
+
+    def __reduce__(self):
+        # mmap/shared-memory backed views (and lazy label tables) cannot be
+        # pickled, and NumPy arrays would pickle NumPy scalars; ship arrays
+        # of plain Python numbers
+        def plain(buf, make):
+            if isinstance(buf, array):
+                return buf
+            return make(buf.tolist() if hasattr(buf, 'tolist') else list(buf))
+        return (CSRGraph, (list(self.labels), plain(self.offsets, lambda v: array('q', v)),
+                           plain(self.targets, lambda v: array('i', v)),
+                           plain(self.weights, _weight_array), self.directed))
+
+    def dfs(self, start):
+        '''Pre-order depth first traversal from start, as in ex4.py.'''
+        offsets, targets, labels = self.offsets, self.targets, self.labels
+        s = self.node_id(start)
+        visited = bytearray(len(labels))
+        visited[s] = 1
+        order = [labels[s]]
+        # explicit stack of (node, next edge position) instead of recursion
+        stack = [(s, offsets[s])]
+        while stack:
+            u, k = stack[-1]
+            end = offsets[u + 1]
+            while k < end and visited[targets[k]]:
+                k += 1
+            if k == end:
+                stack.pop()
+                continue
+            stack[-1] = (u, k + 1)
+            v = targets[k]
+            visited[v] = 1
+            order.append(labels[v])
+            stack.append((v, offsets[v]))
+        return order
+
+    def mst(self):
+        '''Kruskal's algorithm, as in ex3.py. Returns (u, v, weight) edges.'''
+        n = len(self.labels)
+        offsets, targets, weights, labels = self.offsets, self.targets, self.weights, self.labels
+        if self.directed:
+            edges = [(weights[k], u, targets[k])
+                     for u in range(n) for k in range(offsets[u], offsets[u + 1])]
+        else:
+            # each undirected edge is stored once per direction; keep one copy
+            edges = [(weights[k], u, targets[k])
+                     for u in range(n) for k in range(offsets[u], offsets[u + 1]) if u < targets[k]]
+        edges.sort(key=lambda item: item[0])
+
+        parent = list(range(n))
+        rank = bytearray(n)
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        mst_edges = []
+        for weight, u, v in edges:
+            xroot, yroot = find(u), find(v)
+            if xroot != yroot:
+                mst_edges.append((labels[u], labels[v], weight))
+                if rank[xroot] < rank[yroot]:
+                    xroot, yroot = yroot, xroot
+                parent[yroot] = xroot
+                if rank[xroot] == rank[yroot]:
+                    rank[xroot] += 1
+                if len(mst_edges) == n - 1:
+                    break
+        return mst_edges
+
+    def isdag(self):
+        return self._postorder() is not None
+
+    def toposort(self):
+        '''
+        Topological order of the labels, as in ex5.py, or None if the graph
+        has a cycle. Undirected edges count as cycles, exactly like ex5.py.'''
+        order = self._postorder()
+        if order is None:
+            return None
+        labels = self.labels
+        return [labels[i] for i in reversed(order)]
+
+    def _postorder(self):
+        # iterative three-colour DFS: 0 = new, 1 = on stack, 2 = done
+        offsets, targets = self.offsets, self.targets
+        n = len(self.labels)
+        state = bytearray(n)
+        order = []
+        for root in range(n):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, offsets[root])]
+            while stack:
+                u, k = stack[-1]
+                if k == offsets[u + 1]:
+                    stack.pop()
+                    state[u] = 2
+                    order.append(u)
+                    continue
+                stack[-1] = (u, k + 1)
+                v = targets[k]
+                if state[v] == 1:
+                    return None
+                if state[v] == 0:
+                    state[v] = 1
+                    stack.append((v, offsets[v]))
+        return order
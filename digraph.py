@@ -0,0 +1,302 @@
+# digraph.py
+
+'''
+Directed graph with in-degree tracking and a single pass Kahn toposort.
+
+ex5.Graph is undirected: addEdge stores both directions, so every edge is
+a two node cycle and isdag() is False for any graph with an edge. DiGraph
+stores an edge u -> v once, in u's list, and keeps in_degree[v] up to date
+as edges are added and removed.
+
+With the in-degrees already known, kahn_toposort() orders the graph in one
+O(V + E) pass with no recursion: start from the nodes with in-degree 0,
+and every time a node is emitted decrement the in-degree of its successors,
+queueing those that reach 0. If some nodes are never emitted the graph has
+a cycle; each of those nodes still has an unemitted predecessor, so walking
+predecessors among them must run into a cycle, which is returned instead.
+'''
+
+from dotio import iter_dot_edges
+from dynamic_topo import CycleError, DynamicTopoOrder
+
+
+class GraphNode:
+    def __init__(self, data):
+        self.data = data
+
+
+def in_degrees(adjacency_list):
+    '''in-degree of every node of a directed adjacency_list.'''
+    in_degree = dict.fromkeys(adjacency_list, 0)
+    for connections in adjacency_list.values():
+        for neighbor, _ in connections:
+            in_degree[neighbor] += 1
+    return in_degree
+
+
+def kahn_toposort(adjacency_list, in_degree=None):
+    '''
+    Topologically sorts a directed adjacency_list in one pass.
+
+    Args:
+        adjacency_list: dict node -> list of (successor, weight).
+        in_degree: optional dict node -> in-degree (it is not modified);
+            computed from adjacency_list when omitted.
+
+    Returns:
+        (order, None) if the graph is acyclic, where order lists every node
+        with each edge pointing forward, or (None, cycle) otherwise, where
+        cycle is a list of nodes [a, b, ..., z] with edges a -> b -> ... ->
+        z -> a.'''
+    remaining = dict(in_degree) if in_degree is not None else in_degrees(adjacency_list)
+    # order doubles as the FIFO queue: order[i:] are emitted but not expanded
+    order = [node for node, degree in remaining.items() if degree == 0]
+    i = 0
+    while i < len(order):
+        for neighbor, _ in adjacency_list[order[i]]:
+            remaining[neighbor] -= 1
+            if remaining[neighbor] == 0:
+                order.append(neighbor)
+        i += 1
+    if len(order) == len(adjacency_list):
+        return order, None
+    return None, _find_cycle(adjacency_list, remaining)
+
+
+def kahn_levels(adjacency_list, in_degree=None):
+    '''
+    Kahn's algorithm one layer at a time: level 0 holds the nodes with no
+    predecessors, level k the nodes whose last predecessor is in level
+    k - 1. No edge joins two nodes of the same level, so each level can run
+    in parallel once the ones before it are done.
+
+    Returns:
+        (levels, None) for a DAG, where levels is a list of lists of nodes,
+        or (None, cycle) as in kahn_toposort().'''
+    remaining = dict(in_degree) if in_degree is not None else in_degrees(adjacency_list)
+    level = [node for node, degree in remaining.items() if degree == 0]
+    levels = []
+    emitted = 0
+    while level:
+        levels.append(level)
+        emitted += len(level)
+        following = []
+        for node in level:
+            for neighbor, _ in adjacency_list[node]:
+                remaining[neighbor] -= 1
+                if remaining[neighbor] == 0:
+                    following.append(neighbor)
+        level = following
+    if emitted == len(adjacency_list):
+        return levels, None
+    return None, _find_cycle(adjacency_list, remaining)
+
+
+def critical_path(adjacency_list, order):
+    '''
+    Longest path of a DAG with edge weights as costs, given a topological
+    order of it. Returns (length, path); path is a list of nodes.'''
+    finish = dict.fromkeys(order, 0)
+    parent = {}
+    for node in order:
+        base = finish[node]
+        for neighbor, weight in adjacency_list[node]:
+            if base + weight > finish[neighbor]:
+                finish[neighbor] = base + weight
+                parent[neighbor] = node
+    if not finish:
+        return 0, []
+    node = max(finish, key=finish.get)
+    length = finish[node]
+    path = [node]
+    while node in parent:
+        node = parent[node]
+        path.append(node)
+    path.reverse()
+    return length, path
+
+
+def _find_cycle(adjacency_list, remaining):
+    # one unemitted predecessor for every unemitted node
+    predecessor = {}
+    for node, degree in remaining.items():
+        if degree > 0:
+            for neighbor, _ in adjacency_list[node]:
+                if remaining[neighbor] > 0:
+                    predecessor[neighbor] = node
+    node = next(iter(predecessor))
+    seen = {}
+    path = []
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = predecessor[node]
+    cycle = path[seen[node]:]
+    cycle.reverse()
+    return cycle
+
+
+class DiGraph:
+    def __init__(self):
+        self.adjacency_list = {}
+        self.in_degree = {}
+        # DynamicTopoOrder kept in sync by the mutators once track_order() is called
+        self.topo = None
+
+    def addNode(self, data):
+        if data not in self.adjacency_list:
+            self.adjacency_list[data] = []
+            self.in_degree[data] = 0
+            if self.topo is not None:
+                self.topo.add_node(data)
+            return GraphNode(data)
+        return None
+
+    def removeNode(self, node):
+        if node.data not in self.adjacency_list:
+            return
+        if self.topo is not None:
+            self.topo.remove_node(node.data)
+        for neighbor, _ in self.adjacency_list.pop(node.data):
+            if neighbor != node.data:
+                self.in_degree[neighbor] -= 1
+        # incoming edges are only found by scanning, unless there are none
+        if self.in_degree.pop(node.data):
+            for label, connections in self.adjacency_list.items():
+                if any(neighbor == node.data for neighbor, _ in connections):
+                    self.adjacency_list[label] = [(n, w) for n, w in connections if n != node.data]
+
+    def addEdge(self, n1, n2, weight=1):
+        '''
+        Adds the edge n1 -> n2. While the order is tracked, an edge that
+        would close a cycle raises CycleError and is not added.'''
+        if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
+            if self.topo is not None:
+                self.topo.insert(n1.data, n2.data)
+            self.adjacency_list[n1.data].append((n2.data, weight))
+            self.in_degree[n2.data] += 1
+
+    def removeEdge(self, n1, n2):
+        '''Removes every edge n1 -> n2.'''
+        if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
+            connections = self.adjacency_list[n1.data]
+            kept = [(neighbor, weight) for neighbor, weight in connections if neighbor != n2.data]
+            self.in_degree[n2.data] -= len(connections) - len(kept)
+            self.adjacency_list[n1.data] = kept
+            if self.topo is not None:
+                self.topo.delete(n1.data, n2.data)
+
+    def printGraph(self):
+        for node in self.adjacency_list:
+            connections = self.adjacency_list[node]
+            print(f"Node {node} points to:")
+            for neighbor, weight in connections:
+                print(f"  {neighbor} with weight {weight}\n")
+
+    def importFromFile(self, file):
+        '''
+        Streams a "digraph" DOT file (edges written a -> b) into the graph,
+        replacing its contents. Raises DotParseError on malformed input, or
+        CycleError if the order is tracked and the file has a cycle; either
+        way the graph is left unchanged.'''
+        adjacency_list = {}
+        in_degree = {}
+        for node1, node2, weight in iter_dot_edges(file, directed=True):
+            for node in (node1, node2):
+                if node not in adjacency_list:
+                    adjacency_list[node] = []
+                    in_degree[node] = 0
+            adjacency_list[node1].append((node2, weight))
+            in_degree[node2] += 1
+        if self.topo is not None:
+            order, cycle = kahn_toposort(adjacency_list, in_degree)
+            if cycle is not None:
+                raise CycleError(cycle)
+            self.topo = DynamicTopoOrder.from_adjacency(adjacency_list, order)
+        self.adjacency_list = adjacency_list
+        self.in_degree = in_degree
+
+    def topological_order(self):
+        '''(order, None) for a DAG, (None, cycle) otherwise; see kahn_toposort().'''
+        if self.topo is not None:
+            return self.topo.nodes(), None
+        return kahn_toposort(self.adjacency_list, self.in_degree)
+
+    # incrementally maintained topological order (see dynamic_topo.py):
+    # after this, addEdge rejects cycle-closing edges and toposort() reads
+    # the maintained order instead of re-sorting
+    def track_order(self):
+        order, cycle = kahn_toposort(self.adjacency_list, self.in_degree)
+        if cycle is not None:
+            raise CycleError(cycle)
+        self.topo = DynamicTopoOrder.from_adjacency(self.adjacency_list, order)
+        return self.topo
+
+    def isdag(self):
+        return self.topological_order()[1] is None
+
+    def toposort(self):
+        '''Nodes in topological order, or None if the graph has a cycle.'''
+        return self.topological_order()[0]
+
+    def toposort_levels(self):
+        '''Lists of mutually independent nodes, in dependency order, or None if the graph has a cycle.'''
+        return kahn_levels(self.adjacency_list, self.in_degree)[0]
+
+    def critical_path(self):
+        '''
+        (length, path) of the most expensive dependency chain, with edge
+        weights as costs. Raises CycleError if the graph has a cycle.'''
+        order, cycle = self.topological_order()
+        if cycle is not None:
+            raise CycleError(cycle)
+        return critical_path(self.adjacency_list, order)
+
+    def find_cycle(self):
+        '''A list of nodes forming a cycle, or None if the graph is a DAG.'''
+        return self.topological_order()[1]
+
+
+# Single Kahn pass against the two pass DFS toposort (isdag + post-order):
+# python digraph.py [nodes] [edges per node]
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from traversal import iter_dfs
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    d = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    random.seed(338)
+    graph = DiGraph()
+    for i in range(n):
+        graph.addNode(i)
+    # a chain through every node (depth n) plus random forward edges
+    for i in range(n - 1):
+        graph.addEdge(GraphNode(i), GraphNode(i + 1))
+        for _ in range(d - 1):
+            graph.addEdge(GraphNode(i), GraphNode(random.randrange(i + 1, n)))
+
+    def dfs_toposort(adjacency_list):
+        neighbors = lambda node: (neighbor for neighbor, _ in adjacency_list[node])
+        visited, result = set(), []
+        for node in adjacency_list:
+            if node not in visited:
+                result.extend(iter_dfs(neighbors, node, order='post', visited=visited))
+        result.reverse()
+        return result
+
+    start = time.perf_counter()
+    order = graph.toposort()
+    kahn_time = time.perf_counter() - start
+    start = time.perf_counter()
+    dfs_toposort(graph.adjacency_list)
+    dfs_time = time.perf_counter() - start
+    position = {node: k for k, node in enumerate(order)}
+    assert all(position[u] < position[v] for u in graph.adjacency_list for v, _ in graph.adjacency_list[u])
+    print(f"{n} nodes, {sum(graph.in_degree.values())} edges")
+    print(f"Kahn {kahn_time:.2f} s, DFS post-order (no cycle check) {dfs_time:.2f} s")
+
+    graph.addEdge(GraphNode(n - 1), GraphNode(n // 2))
+    print("cycle after adding", n - 1, "->", n // 2, "has length", len(graph.find_cycle()))
@@ -0,0 +1,97 @@
+# disjointset.py
+
+'''
+Union-find (disjoint set) over integer ids 0..n-1.
+
+parent is a flat int64 array and rank a bytearray, so a set costs 9 bytes
+per element instead of two dict entries. find() is iterative with path
+halving and union() uses union by rank, which together keep every
+operation at near-constant amortised cost.
+'''
+
+from array import array
+
+
+class DisjointSet:
+    def __init__(self, n=0):
+        self.parent = array('q', range(n))
+        self.rank = bytearray(n)
+        self.count = n  # number of disjoint sets
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add(self):
+        '''Adds a new singleton set and returns its id.'''
+        i = len(self.parent)
+        self.parent.append(i)
+        self.rank.append(0)
+        self.count += 1
+        return i
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, x, y):
+        '''Merges the sets of x and y; returns False if already merged.'''
+        xroot, yroot = self.find(x), self.find(y)
+        if xroot == yroot:
+            return False
+        rank = self.rank
+        if rank[xroot] < rank[yroot]:
+            xroot, yroot = yroot, xroot
+        self.parent[yroot] = xroot
+        if rank[xroot] == rank[yroot]:
+            rank[xroot] += 1
+        self.count -= 1
+        return True
+
+    def connected(self, x, y):
+        return self.find(x) == self.find(y)
+
+    def find_many(self, ids):
+        '''Roots of every id in ids, as a list.'''
+        parent = self.parent
+        roots = []
+        for i in ids:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            roots.append(i)
+        return roots
+
+    def union_many(self, pairs):
+        '''
+        Unions every (x, y) pair from an iterable; returns how many of them
+        merged two different sets. Inlines find/union to avoid per-pair
+        method calls.'''
+        parent, rank = self.parent, self.rank
+        merged = 0
+        for x, y in pairs:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            while parent[y] != y:
+                parent[y] = parent[parent[y]]
+                y = parent[y]
+            if x == y:
+                continue
+            if rank[x] < rank[y]:
+                x, y = y, x
+            parent[y] = x
+            if rank[x] == rank[y]:
+                rank[x] += 1
+            merged += 1
+        self.count -= merged
+        return merged
+
+    def groups(self):
+        '''Lists of ids per set, in order of each set's smallest id.'''
+        members = {}
+        for i, root in enumerate(self.find_many(range(len(self.parent)))):
+            members.setdefault(root, []).append(i)
+        return list(members.values())
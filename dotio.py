@@ -0,0 +1,126 @@
+# dotio.py
+
+'''
+Streaming reader for the "strict graph" DOT files used in this lab
+(random.dot), and for their directed "digraph" counterpart:
+
+    strict graph G {
+        0 -- 557    [weight=45];
+        ...
+    }
+
+    digraph G {
+        0 -> 557    [weight=45];
+        ...
+    }
+
+The file is read line by line through Python's buffered file iterator, so
+only the current line is held in memory no matter how large the file is.
+Malformed input raises DotParseError carrying the file name and line number.
+'''
+
+
+class DotParseError(ValueError):
+    def __init__(self, file, lineno, message, line=''):
+        self.file = file
+        self.lineno = lineno
+        self.line = line
+        super().__init__(f"{file}:{lineno}: {message}")
+
+
+def _parse_weight(file, lineno, line, attributes):
+    start = attributes.find('weight')
+    if start == -1:
+        return 1
+    value = attributes[start + 6:].lstrip()
+    if not value.startswith('='):
+        raise DotParseError(file, lineno, "expected '=' after weight", line)
+    value = value[1:].split(',', 1)[0].split(']', 1)[0].strip().strip('"')
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            raise DotParseError(file, lineno, f"invalid weight {value!r}", line) from None
+
+
+def iter_dot_edges(file, directed=False):
+    '''
+    Yields (node1, node2, weight) for every edge statement in a strict graph
+    DOT file, in file order. Edges without a weight attribute get weight 1.
+    With directed=True the file must instead be a digraph whose edges are
+    written node1 -> node2.
+
+    Raises:
+        FileNotFoundError: if the file does not exist.
+        DotParseError: if the header is missing or an edge line is malformed.'''
+    if directed:
+        headers, op, expected = ('digraph', 'strict digraph'), '->', "'digraph' header"
+    else:
+        headers, op, expected = ('strict graph',), '--', "'strict graph' header"
+    with open(file, 'r') as f:
+        header_seen = False
+        for lineno, line in enumerate(f, 1):
+            stripped = line.strip()
+            if not stripped or stripped.startswith(('//', '#')):
+                continue
+            if not header_seen:
+                if not stripped.startswith(headers):
+                    raise DotParseError(file, lineno, f"expected {expected}", stripped)
+                header_seen = True
+                continue
+            if op not in stripped:
+                # closing brace, graph attributes, bare node statements
+                continue
+
+            nodes, _, attributes = stripped.partition('[')
+            node1, sep, node2 = nodes.partition(op)
+            node1 = node1.strip()
+            node2 = node2.strip().rstrip(';').strip()
+            if not sep or not node1 or not node2 or op in node2:
+                raise DotParseError(file, lineno, f"expected 'node1 {op} node2'", stripped)
+            if attributes and ']' not in attributes:
+                raise DotParseError(file, lineno, "unterminated attribute list", stripped)
+            yield node1, node2, _parse_weight(file, lineno, stripped, attributes)
+
+        if not header_seen:
+            raise DotParseError(file, 1, f"expected {expected}")
+
+
+# Throughput check: python dotio.py [copies]
+# Builds random.dot scaled up by relabelling and repeating its edges, then
+# reports how fast the streaming reader gets through it.
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    import time
+    import tracemalloc
+
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    base = list(iter_dot_edges("random.dot"))
+
+    fd, path = tempfile.mkstemp(suffix=".dot")
+    with os.fdopen(fd, 'w') as out:
+        out.write("strict graph G {\n")
+        for c in range(copies):
+            for node1, node2, weight in base:
+                out.write(f"\t{c}_{node1} -- {c}_{node2}\t[weight={weight}];\n")
+        out.write("}\n")
+
+    try:
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_dot_edges(path))
+        elapsed = time.perf_counter() - start
+
+        # second pass only for memory; tracemalloc slows the parser down
+        tracemalloc.start()
+        for _ in iter_dot_edges(path):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{count} edges, {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"{count / elapsed:,.0f} edges/s, peak parser memory {peak / 1024:.1f} KiB")
+    finally:
+        os.remove(path)
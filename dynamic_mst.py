@@ -0,0 +1,220 @@
+# dynamic_mst.py
+
+'''
+Minimum spanning forest kept up to date under edge insertions and
+deletions, so a few edge changes do not require a full Graph.mst() rerun.
+
+    insert(u, v, w)  if u and v are in different trees the edge joins them;
+                     otherwise it closes a cycle with the tree path u .. v
+                     and replaces the heaviest edge on that path if lighter
+                     (cycle property). Cost: one walk over u's tree.
+    delete(u, v)     deleting a non-tree edge is O(1). Deleting a tree edge
+                     splits its tree; both halves are explored in lockstep so
+                     only the smaller one is fully visited, and the cheapest
+                     non-tree edge leaving it reconnects the two (cut
+                     property). Cost: size and degree of the smaller half.
+
+Neither touches the rest of the graph, and nothing is re-sorted. Parallel
+edges collapse to the lightest one, matching what an MST can use.
+'''
+
+from collections import deque
+
+from mst import kruskal
+
+
+class DynamicMST:
+    def __init__(self):
+        self.tree = {}      # node -> {neighbor: weight} for forest edges
+        self.nontree = {}   # node -> {neighbor: weight} for every other edge
+        self.total_weight = 0
+
+    @classmethod
+    def from_graph(cls, graph):
+        '''Initial forest from a lab graph via Kruskal.'''
+        return cls.from_adjacency(graph.adjacency_list)
+
+    @classmethod
+    def from_adjacency(cls, adjacency_list):
+        forest = cls()
+        for node in adjacency_list:
+            forest.add_node(node)
+        for u, v, weight in kruskal(adjacency_list):
+            forest._link(forest.tree, u, v, weight)
+            forest.total_weight += weight
+        for u, connections in adjacency_list.items():
+            for v, weight in connections:
+                if u == v or v in forest.tree[u]:
+                    continue
+                current = forest.nontree[u].get(v)
+                if current is None or weight < current:
+                    forest._link(forest.nontree, u, v, weight)
+        return forest
+
+    # ---- helpers ----
+
+    @staticmethod
+    def _link(side, u, v, weight):
+        side[u][v] = weight
+        side[v][u] = weight
+
+    @staticmethod
+    def _unlink(side, u, v):
+        del side[u][v]
+        del side[v][u]
+
+    def _tree_path(self, u, v):
+        # BFS over u's tree; returns the node list u .. v or None
+        parent = {u: None}
+        queue = deque([u])
+        tree = self.tree
+        while queue:
+            node = queue.popleft()
+            if node == v:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+            for neighbor in tree[node]:
+                if neighbor not in parent:
+                    parent[neighbor] = node
+                    queue.append(neighbor)
+        return None
+
+    def _smaller_side(self, u, v):
+        # explore the two trees left after cutting u - v in lockstep and
+        # return the node set of whichever finishes first
+        tree = self.tree
+        seen = ({u}, {v})
+        queues = (deque([u]), deque([v]))
+        while True:
+            for side in (0, 1):
+                queue = queues[side]
+                if not queue:
+                    return seen[side]
+                node = queue.popleft()
+                for neighbor in tree[node]:
+                    if neighbor not in seen[side]:
+                        seen[side].add(neighbor)
+                        queues[side].append(neighbor)
+
+    # ---- updates ----
+
+    def add_node(self, node):
+        if node not in self.tree:
+            self.tree[node] = {}
+            self.nontree[node] = {}
+
+    def insert(self, u, v, weight):
+        self.add_node(u)
+        self.add_node(v)
+        if u == v:
+            return
+        if v in self.tree[u]:
+            # parallel edge: a lighter copy just makes the tree lighter
+            if weight < self.tree[u][v]:
+                self.total_weight -= self.tree[u][v] - weight
+                self._link(self.tree, u, v, weight)
+            return
+        if v in self.nontree[u]:
+            if weight >= self.nontree[u][v]:
+                return
+            self._unlink(self.nontree, u, v)
+
+        path = self._tree_path(u, v)
+        if path is None:
+            self._link(self.tree, u, v, weight)
+            self.total_weight += weight
+            return
+        heaviest = max(zip(path, path[1:]), key=lambda edge: self.tree[edge[0]][edge[1]])
+        heavy_weight = self.tree[heaviest[0]][heaviest[1]]
+        if weight < heavy_weight:
+            self._unlink(self.tree, *heaviest)
+            self._link(self.nontree, heaviest[0], heaviest[1], heavy_weight)
+            self._link(self.tree, u, v, weight)
+            self.total_weight += weight - heavy_weight
+        else:
+            self._link(self.nontree, u, v, weight)
+
+    def delete(self, u, v):
+        if u not in self.tree or v not in self.tree:
+            return
+        if v in self.nontree[u]:
+            self._unlink(self.nontree, u, v)
+            return
+        if v not in self.tree[u]:
+            return
+        self.total_weight -= self.tree[u][v]
+        self._unlink(self.tree, u, v)
+
+        side = self._smaller_side(u, v)
+        best = None
+        for node in side:
+            for neighbor, weight in self.nontree[node].items():
+                if neighbor not in side and (best is None or weight < best[2]):
+                    best = (node, neighbor, weight)
+        if best is not None:
+            a, b, weight = best
+            self._unlink(self.nontree, a, b)
+            self._link(self.tree, a, b, weight)
+            self.total_weight += weight
+
+    def remove_node(self, node):
+        if node not in self.tree:
+            return
+        for neighbor in list(self.nontree[node]):
+            self._unlink(self.nontree, node, neighbor)
+        for neighbor in list(self.tree[node]):
+            self.delete(node, neighbor)
+        del self.tree[node]
+        del self.nontree[node]
+
+    def edges(self):
+        '''Current forest as (u, v, weight) triples, each edge once.'''
+        result = []
+        done = set()
+        for u, connections in self.tree.items():
+            done.add(u)
+            for v, weight in connections.items():
+                if v not in done:
+                    result.append((u, v, weight))
+        return result
+
+
+# Update cost vs full rebuild: python dynamic_mst.py [nodes] [edges]
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    random.seed(338)
+    adjacency_list = {i: [] for i in range(n)}
+    pairs = set()
+    while len(pairs) < m:
+        u, v = random.randrange(n), random.randrange(n)
+        if u != v and (v, u) not in pairs:
+            pairs.add((u, v))
+    for u, v in pairs:
+        weight = random.randint(1, 100)
+        adjacency_list[u].append((v, weight))
+        adjacency_list[v].append((u, weight))
+
+    start = time.perf_counter()
+    kruskal(adjacency_list)
+    rebuild = time.perf_counter() - start
+    forest = DynamicMST.from_adjacency(adjacency_list)
+
+    updates = 200
+    pairs = list(pairs)
+    start = time.perf_counter()
+    for _ in range(updates):
+        u, v = random.choice(pairs)
+        forest.delete(u, v)
+        forest.insert(u, v, random.randint(1, 100))
+    per_update = (time.perf_counter() - start) / (2 * updates)
+    print(f"{n} nodes, {m} edges")
+    print(f"full rebuild: {rebuild * 1000:8.1f} ms")
+    print(f"per update:   {per_update * 1000:8.3f} ms")
@@ -0,0 +1,193 @@
+# dynamic_topo.py
+
+'''
+Topological order kept up to date under edge insertions (Pearce-Kelly), so
+a DAG that grows one edge at a time does not need a full toposort per edge.
+
+Every node has a position in order. Inserting u -> v when u already comes
+before v changes nothing. Otherwise only the nodes between v and u can be
+affected:
+
+    forward   nodes reachable from v with position < position(u); reaching
+              u itself means the edge would close a cycle, and it is
+              rejected with CycleError before anything is changed
+    backward  nodes reaching u with position > position(v)
+
+The backward set is then moved in front of the forward set, reusing the
+positions both sets already occupy. Nothing outside the region between v
+and u is visited, so the cost depends on the size of that region rather
+than on the graph. Deleting an edge never invalidates the order and is O(1).
+'''
+
+
+class CycleError(ValueError):
+    def __init__(self, cycle):
+        self.cycle = cycle  # [a, b, ..., z] with edges a -> b -> ... -> z -> a
+        super().__init__("cycle " + " -> ".join(map(str, cycle + cycle[:1])))
+
+
+class DynamicTopoOrder:
+    def __init__(self):
+        self.order = []         # position -> node (None for a removed node)
+        self.position = {}      # node -> position
+        self.successors = {}    # node -> set of successors
+        self.predecessors = {}  # node -> set of predecessors
+
+    @classmethod
+    def from_adjacency(cls, adjacency_list, order):
+        '''
+        Starts from a directed adjacency_list and one of its topological
+        orders (e.g. digraph.kahn_toposort()).'''
+        topo = cls()
+        for node in order:
+            topo.add_node(node)
+        for u, connections in adjacency_list.items():
+            for v, _ in connections:
+                topo.successors[u].add(v)
+                topo.predecessors[v].add(u)
+        return topo
+
+    def __iter__(self):
+        return (node for node in self.order if node is not None)
+
+    def __len__(self):
+        return len(self.position)
+
+    def nodes(self):
+        '''Current topological order as a list.'''
+        return list(self)
+
+    def add_node(self, node):
+        if node not in self.position:
+            self.position[node] = len(self.order)
+            self.order.append(node)
+            self.successors[node] = set()
+            self.predecessors[node] = set()
+
+    def remove_node(self, node):
+        if node not in self.position:
+            return
+        for successor in self.successors.pop(node):
+            self.predecessors[successor].discard(node)
+        for predecessor in self.predecessors.pop(node):
+            self.successors[predecessor].discard(node)
+        self.order[self.position.pop(node)] = None
+        # compact once removed slots make up half of the order
+        if 2 * len(self.position) < len(self.order):
+            self.order = list(self)
+            self.position = {node: k for k, node in enumerate(self.order)}
+
+    def insert(self, u, v):
+        '''Adds the edge u -> v; raises CycleError (and changes nothing) if it closes a cycle.'''
+        if v in self.successors[u]:
+            return
+        if u == v:
+            raise CycleError([u])
+        position = self.position
+        if position[v] < position[u]:
+            forward = self._forward(v, u)
+            backward = self._backward(u, position[v])
+            self._reorder(backward, forward)
+        self.successors[u].add(v)
+        self.predecessors[v].add(u)
+
+    def delete(self, u, v):
+        '''Removes the edge u -> v if present; the order stays valid.'''
+        if u in self.successors and v in self.successors[u]:
+            self.successors[u].remove(v)
+            self.predecessors[v].remove(u)
+
+    def precedes(self, u, v):
+        '''True if u comes before v in the current order.'''
+        return self.position[u] < self.position[v]
+
+    # ---- Pearce-Kelly search and reorder ----
+
+    def _forward(self, v, u):
+        # nodes reachable from v that sit before u; hitting u is a cycle
+        position, successors = self.position, self.successors
+        upper = position[u]
+        parent = {v: None}
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            for successor in successors[node]:
+                if successor == u:
+                    cycle = [u]
+                    while node is not None:
+                        cycle.append(node)
+                        node = parent[node]
+                    cycle[1:] = cycle[:0:-1]
+                    raise CycleError(cycle)
+                if successor not in parent and position[successor] < upper:
+                    parent[successor] = node
+                    stack.append(successor)
+        return list(parent)
+
+    def _backward(self, u, lower):
+        # nodes that reach u and sit after v
+        position, predecessors = self.position, self.predecessors
+        seen = {u}
+        stack = [u]
+        while stack:
+            for predecessor in predecessors[stack.pop()]:
+                if predecessor not in seen and position[predecessor] > lower:
+                    seen.add(predecessor)
+                    stack.append(predecessor)
+        return list(seen)
+
+    def _reorder(self, backward, forward):
+        position, order = self.position, self.order
+        key = position.__getitem__
+        backward.sort(key=key)
+        forward.sort(key=key)
+        slots = sorted(map(key, backward + forward))
+        for slot, node in zip(slots, backward + forward):
+            position[node] = slot
+            order[slot] = node
+
+
+# Incremental insertion against a full Kahn re-sort per edge:
+# python dynamic_topo.py [nodes] [edges]
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from digraph import kahn_toposort
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 60000
+    random.seed(338)
+    # edges of a random DAG over a hidden order, inserted in random order
+    hidden = list(range(n))
+    random.shuffle(hidden)
+    edges = []
+    for _ in range(m):
+        i, j = sorted(random.sample(range(n), 2))
+        edges.append((hidden[i], hidden[j]))
+
+    topo = DynamicTopoOrder()
+    for node in range(n):
+        topo.add_node(node)
+    start = time.perf_counter()
+    for u, v in edges:
+        topo.insert(u, v)
+    incremental = (time.perf_counter() - start) / m
+
+    # what every insertion costs without it: one Kahn pass over the graph
+    adjacency_list = {node: [(v, 1) for v in topo.successors[node]] for node in range(n)}
+    start = time.perf_counter()
+    kahn_toposort(adjacency_list)
+    resort = time.perf_counter() - start
+
+    order = topo.nodes()
+    rank = {node: k for k, node in enumerate(order)}
+    assert all(rank[u] < rank[v] for u, v in edges)
+    try:
+        u, v = edges[0]
+        topo.insert(v, u)
+    except CycleError as error:
+        print(error)
+    print(f"{n} nodes, {m} edges")
+    print(f"incremental {incremental * 1e6:8.1f} us per edge, full re-sort {resort * 1e6:8.1f} us")
@@ -1,3 +1,6 @@
+from dotio import iter_dot_edges
+
+
 class GraphNode:
     def __init__(self, data):
         self.data = data
@@ -14,7 +17,11 @@ class Graph:
 
     def removeNode(self, node):
         if node.data in self.adjacency_list:
-            del self.adjacency_list[node.data]
+            # drop the node's entries from its neighbors' lists too, so no
+            # (node, weight) pairs are left dangling
+            for neighbor in {neighbor for neighbor, _ in self.adjacency_list.pop(node.data)}:
+                if neighbor in self.adjacency_list:
+                    self.adjacency_list[neighbor] = [(n, w) for n, w in self.adjacency_list[neighbor] if n != node.data]
 
     def addEdge(self, n1, n2, weight=1):
         if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
@@ -34,43 +41,28 @@ class Graph:
                 print(f"  {neighbor} with weight {weight}\n")
 
     def importFromFile(self, file):
-        try:
-            with open(file, 'r') as f:
-                graph_content = f.read()
-
-            if "strict graph" not in graph_content:
-                return None
-
-            self.adjacency_list = {}
-            lines = graph_content.split('\n')
-
-            for line in lines:
-                if '--' in line:
-                    nodes, attributes = line.split('[')
-                    node1, node2 = nodes.strip().split('--')
-                    node1 = node1.strip()
-                    node2 = node2.strip()
-                    weight = 1
-                    if 'weight' in attributes:
-                        weight = int(attributes.split('=')[1].strip('];'))
-                    self.addNode(node1)
-                    self.addNode(node2)
-                    self.addEdge(GraphNode(node1), GraphNode(node2), weight)
-
-        except FileNotFoundError:
-            print("File not found.")
-            return None
-        except Exception as e:
-            print("Error occurred while parsing the file:", e)
-            return None
+        '''
+        Streams a "strict graph" DOT file into the graph, replacing its
+        contents. Raises DotParseError (with the line number) on malformed
+        input, in which case the graph is left unchanged.'''
+        adjacency_list = {}
+        for node1, node2, weight in iter_dot_edges(file):
+            if node1 not in adjacency_list:
+                adjacency_list[node1] = []
+            if node2 not in adjacency_list:
+                adjacency_list[node2] = []
+            adjacency_list[node1].append((node2, weight))
+            adjacency_list[node2].append((node1, weight))
+        self.adjacency_list = adjacency_list
 
 
 # Example usage:
-graph = Graph()
-graph.addNode('A')
-graph.addNode('B')
-graph.addNode('C')
-graph.addEdge(GraphNode('A'), GraphNode('B'), 5)
-graph.addEdge(GraphNode('A'), GraphNode('C'), 10)
-graph.printGraph()
-# graph.importFromFile('example_graph.txt')
+if __name__ == "__main__":
+    graph = Graph()
+    graph.addNode('A')
+    graph.addNode('B')
+    graph.addNode('C')
+    graph.addEdge(GraphNode('A'), GraphNode('B'), 5)
+    graph.addEdge(GraphNode('A'), GraphNode('C'), 10)
+    graph.printGraph()
+    # graph.importFromFile('example_graph.txt')
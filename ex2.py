@@ -1,6 +1,13 @@
 import time
-import matplotlib.pyplot as plt
 import heapq
+from ch import ContractionHierarchy
+from csr import CSRGraph
+from dotio import iter_dot_edges
+import instrument
+from parallel import all_sources_sp
+from snapshot import load_snapshot, save_snapshot
+from spcache import SPCache
+from sssp import bidirectional_dijkstra, bounded_dijkstra, dijkstra
 
 '''
  In the lecture, we have discussed Dijkstras algorithm for computing
@@ -33,23 +40,35 @@ class GraphNode:
 
 
 class Graph:
-    def __init__(self):
+    def __init__(self, cache_entries=128, cache_bytes=None):
         self.adjacency_list = {}
+        # bumped by every mutation; keys the shortest path cache
+        self.version = 0
+        self.sp_cache = SPCache(cache_entries, cache_bytes)
+        # instrument.Profiler, set by instrument(); None means no stats
+        self.profiler = None
 
     def addNode(self, data):
         if data not in self.adjacency_list:
             self.adjacency_list[data] = []
+            self.version += 1
             return GraphNode(data)
         return None
 
     def removeNode(self, node):
         if node.data in self.adjacency_list:
-            del self.adjacency_list[node.data]
+            # drop the node's entries from its neighbors' lists too, so no
+            # (node, weight) pairs are left dangling
+            for neighbor in {neighbor for neighbor, _ in self.adjacency_list.pop(node.data)}:
+                if neighbor in self.adjacency_list:
+                    self.adjacency_list[neighbor] = [(n, w) for n, w in self.adjacency_list[neighbor] if n != node.data]
+            self.version += 1
 
     def addEdge(self, n1, n2, weight=1):
         if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
             self.adjacency_list[n1.data].append((n2.data, weight))
             self.adjacency_list[n2.data].append((n1.data, weight))
+            self.version += 1
 
     def removeEdge(self, n1, n2):
         if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
@@ -57,6 +76,18 @@ class Graph:
                 (neighbor, weight) for neighbor, weight in self.adjacency_list[n1.data] if neighbor != n2.data]
             self.adjacency_list[n2.data] = [
                 (neighbor, weight) for neighbor, weight in self.adjacency_list[n2.data] if neighbor != n1.data]
+            self.version += 1
+
+    def save_snapshot(self, path):
+        '''Freezes the graph into CSR form and writes it as a binary snapshot.'''
+        save_snapshot(CSRGraph.from_graph(self), path)
+
+    @staticmethod
+    def load_snapshot(path):
+        '''
+        Memory-maps a snapshot written by save_snapshot(). Returns a read-only
+        CSRGraph that supports the same queries as this class.'''
+        return load_snapshot(path)
 
     def printGraph(self):
         for node in self.adjacency_list:
@@ -66,35 +97,20 @@ class Graph:
                 print(f"  {neighbor} with weight {weight}\n")
 
     def importFromFile(self, file):
-        try:
-            with open(file, 'r') as f:
-                graph_content = f.read()
-
-            if "strict graph" not in graph_content:
-                return None
-
-            self.adjacency_list = {}
-            lines = graph_content.split('\n')
-
-            for line in lines:
-                if '--' in line:
-                    nodes, attributes = line.split('[')
-                    node1, node2 = nodes.strip().split('--')
-                    node1 = node1.strip()
-                    node2 = node2.strip()
-                    weight = 1
-                    if 'weight' in attributes:
-                        weight = int(attributes.split('=')[1].strip('];'))
-                    self.addNode(node1)
-                    self.addNode(node2)
-                    self.addEdge(GraphNode(node1), GraphNode(node2), weight)
-
-        except FileNotFoundError:
-            print("File not found.")
-            return None
-        except Exception as e:
-            print("Error occurred while parsing the file:", e)
-            return None
+        '''
+        Streams a "strict graph" DOT file into the graph, replacing its
+        contents. Raises DotParseError (with the line number) on malformed
+        input, in which case the graph is left unchanged.'''
+        adjacency_list = {}
+        for node1, node2, weight in iter_dot_edges(file):
+            if node1 not in adjacency_list:
+                adjacency_list[node1] = []
+            if node2 not in adjacency_list:
+                adjacency_list[node2] = []
+            adjacency_list[node1].append((node2, weight))
+            adjacency_list[node2].append((node1, weight))
+        self.adjacency_list = adjacency_list
+        self.version += 1
 
     def slowSP(self, node):
         distances = {key: float('inf') for key in self.adjacency_list}
@@ -114,75 +130,146 @@ class Graph:
                     distances[neighbor] = alt
         return distances
 
-    def fastSP(self, node):
-        distances = {key: float('inf') for key in self.adjacency_list}
+    def fastSP(self, node, queue='heap', max_weight=None, stats=None):
+        '''
+        Dijkstra from node. queue selects the priority queue: 'heap' (binary
+        heap, the default), or 'dial' / 'radix' for non-negative integer
+        weights (see sssp.py). With an instrument.Stats as stats the search
+        counts its work into it; an attached profiler passes one on every
+        call.'''
+        if self.profiler is not None and stats is None:
+            return self.profiler.run('fastSP', self.fastSP, node, queue, max_weight)
+        if queue != 'heap':
+            return dijkstra(self.adjacency_list, node.data, queue, max_weight, stats)
+        adjacency_list = self.adjacency_list
+        distances = {key: float('inf') for key in adjacency_list}
         distances[node.data] = 0
-        unvisited = [(0, node.data)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        if stats is not None:
+            adjacency_list = instrument.CountingAdjacency(adjacency_list, stats.counters)
+            heappush, heappop = instrument.QueueCounter(stats.counters).heap_functions()
+        unvisited = []
+        heappush(unvisited, (0, node.data))
         while unvisited:
-            curr_dist, curr_node = heapq.heappop(unvisited)
-            for neighbor, weight in self.adjacency_list[curr_node]:
+            curr_dist, curr_node = heappop(unvisited)
+            # skip stale entries left behind by later, shorter pushes
+            if curr_dist > distances[curr_node]:
+                continue
+            for neighbor, weight in adjacency_list[curr_node]:
                 alt = curr_dist + weight
                 if alt < distances[neighbor]:
                     distances[neighbor] = alt
-                    heapq.heappush(unvisited, (alt, neighbor))
-        return distances 
+                    heappush(unvisited, (alt, neighbor))
+        return distances
+
+    def instrument(self, profiler=None):
+        '''
+        Collects per-call stats (settled nodes, scanned edges, queue pushes
+        and pops, timing) for fastSP from now on; see instrument.py. Returns
+        the Profiler. Set graph.profiler = None to stop.'''
+        self.profiler = profiler if profiler is not None else instrument.Profiler()
+        return self.profiler
+
+    def cachedSP(self, node):
+        '''
+        fastSP through the graph's LRU cache (self.sp_cache). Repeated
+        queries for the same source between mutations are a dict lookup.
+        Returns a read-only mapping shared with other callers.'''
+        return self.sp_cache.get(node.data, self.version, lambda source: self.fastSP(GraphNode(source)))
+
+    # Early-terminating variants of fastSP. All of them hand back a
+    # predecessor map; sssp.build_path(predecessors, label) rebuilds the path
+    # without searching again.
+    def pointSP(self, n1, n2):
+        '''(distance from n1 to n2, predecessors); stops once n2 is settled.'''
+        distances, predecessors = bounded_dijkstra(self.adjacency_list, n1.data, target=n2.data)
+        return distances.get(n2.data, float('inf')), predecessors
+
+    def radiusSP(self, node, radius):
+        '''(distances, predecessors) for every node within radius of node.'''
+        return bounded_dijkstra(self.adjacency_list, node.data, radius=radius)
+
+    def nearestSP(self, node, k):
+        '''(distances, predecessors) for the k nodes closest to node (node included).'''
+        return bounded_dijkstra(self.adjacency_list, node.data, k=k)
+
+    def bidirectionalSP(self, n1, n2):
+        '''(distance from n1 to n2, predecessors) via bidirectional Dijkstra.'''
+        return bidirectional_dijkstra(self.adjacency_list, n1.data, n2.data)
+
+    def contraction_hierarchy(self, max_settled=64):
+        '''
+        Preprocesses the graph into a ContractionHierarchy (see ch.py) for
+        fast repeated distance()/path() queries. The index is a snapshot: it
+        does not follow later changes to the graph.'''
+        return ContractionHierarchy.build(self, max_settled)
+
+    def all_sources_sp(self, sources=None, workers=None):
+        '''
+        fastSP from every source (default: all nodes) on a process pool.
+        Yields (source, distances) pairs as workers finish them.'''
+        return all_sources_sp(self, sources, workers)
 
 ''' 3: Measure the performance of each algorithm on the sample graph
 provided on the lab's D2L (random.dot).
     • Time the execution of the algorithm, for all nodes
     • Report average, max and min time'''
 
-print("Start")
-graph = Graph()
-graph.importFromFile("random.dot")
-
-slowSP_times = []
-fastSP_times = []
-
-for node in graph.adjacency_list.keys():
-    # time for slowSP
-    start_time = time.time()
-    graph.slowSP(GraphNode(node))
-    slowSP_times.append(time.time() - start_time)
-
-    # time for fastSP
-    start_time = time.time()
-    graph.fastSP(GraphNode(node))
-    fastSP_times.append(time.time() - start_time)
-
-print("Timings done\n")
-
-slowSP_avgTime = sum(slowSP_times) / len(slowSP_times)
-slowSP_maxTime = max(slowSP_times)
-slowSP_minTime = min(slowSP_times)
-
-fastSP_avgTime = sum(fastSP_times) / len(fastSP_times)
-fastSP_maxTime = max(fastSP_times)
-fastSP_minTime = min(fastSP_times)
-
-# Print the results
-print("slowSP performance:")
-print("Min time:", slowSP_minTime)
-print("Max time:", slowSP_maxTime)
-print("Avg time:", slowSP_avgTime)
-
-print("\nfastSP performance:")
-print("Min time:", fastSP_minTime)
-print("Max time:", fastSP_maxTime)
-print("Avg time:", fastSP_avgTime)
-
-''' 4: Plot a histogram of the distribution of execution times across all
-nodes, and discuss the results'''
-
-plt.figure(figsize=(10, 5))
-plt.hist(slowSP_times, bins = 20, color='blue', alpha=0.5, label='slowSP')
-plt.hist(fastSP_times, bins = 20, color='red', alpha=0.5, label='fastSP')
-plt.title('Distribution of Execution Times for slowSP and fastSP')
-plt.xlabel('Execution Time')
-plt.ylabel('Frequency')
-plt.legend()
-plt.grid(True)
-plt.show()
+# Lab timing; see bench.py for the repeatable benchmark suite
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    print("Start")
+    graph = Graph()
+    graph.importFromFile("random.dot")
+
+    slowSP_times = []
+    fastSP_times = []
+
+    for node in graph.adjacency_list.keys():
+        # time for slowSP
+        start_time = time.perf_counter()
+        graph.slowSP(GraphNode(node))
+        slowSP_times.append(time.perf_counter() - start_time)
+
+        # time for fastSP
+        start_time = time.perf_counter()
+        graph.fastSP(GraphNode(node))
+        fastSP_times.append(time.perf_counter() - start_time)
+
+    print("Timings done\n")
+
+    slowSP_avgTime = sum(slowSP_times) / len(slowSP_times)
+    slowSP_maxTime = max(slowSP_times)
+    slowSP_minTime = min(slowSP_times)
+
+    fastSP_avgTime = sum(fastSP_times) / len(fastSP_times)
+    fastSP_maxTime = max(fastSP_times)
+    fastSP_minTime = min(fastSP_times)
+
+    # Print the results
+    print("slowSP performance:")
+    print("Min time:", slowSP_minTime)
+    print("Max time:", slowSP_maxTime)
+    print("Avg time:", slowSP_avgTime)
+
+    print("\nfastSP performance:")
+    print("Min time:", fastSP_minTime)
+    print("Max time:", fastSP_maxTime)
+    print("Avg time:", fastSP_avgTime)
+
+    ''' 4: Plot a histogram of the distribution of execution times across all
+    nodes, and discuss the results'''
+
+    plt.figure(figsize=(10, 5))
+    plt.hist(slowSP_times, bins = 20, color='blue', alpha=0.5, label='slowSP')
+    plt.hist(fastSP_times, bins = 20, color='red', alpha=0.5, label='fastSP')
+    plt.title('Distribution of Execution Times for slowSP and fastSP')
+    plt.xlabel('Execution Time')
+    plt.ylabel('Frequency')
+    plt.legend()
+    plt.grid(True)
+    plt.show()
 
 '''
 Results: 
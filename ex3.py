@@ -1,5 +1,11 @@
 # ex3.py
 
+from disjointset import DisjointSet
+from dotio import iter_dot_edges
+from dynamic_mst import DynamicMST
+import instrument
+from mst import minimum_spanning_tree
+
 class GraphNode:
     def __init__(self, data):
         self.data = data
@@ -7,26 +13,53 @@ class GraphNode:
 class Graph:
     def __init__(self):
         self.adjacency_list = {}
+        # DynamicMST kept in sync by the mutators once track_mst() is called
+        self.forest = None
+        # (label -> id, DisjointSet) built lazily for connectivity queries;
+        # additions are merged in place, removals drop it
+        self.components = None
+        # instrument.Profiler, set by instrument(); None means no stats
+        self.profiler = None
 
     def addNode(self, data):
         if data not in self.adjacency_list:
             self.adjacency_list[data] = []
+            if self.forest is not None:
+                self.forest.add_node(data)
+            if self.components is not None:
+                index, sets = self.components
+                index[data] = sets.add()
             return GraphNode(data)
         return None
 
     def removeNode(self, node):
         if node.data in self.adjacency_list:
-            del self.adjacency_list[node.data]
+            # drop the node's entries from its neighbors' lists too, so no
+            # (node, weight) pairs are left dangling
+            for neighbor in {neighbor for neighbor, _ in self.adjacency_list.pop(node.data)}:
+                if neighbor in self.adjacency_list:
+                    self.adjacency_list[neighbor] = [(n, w) for n, w in self.adjacency_list[neighbor] if n != node.data]
+            if self.forest is not None:
+                self.forest.remove_node(node.data)
+            self.components = None
 
     def addEdge(self, n1, n2, weight=1):
         if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
             self.adjacency_list[n1.data].append((n2.data, weight))
             self.adjacency_list[n2.data].append((n1.data, weight))
+            if self.forest is not None:
+                self.forest.insert(n1.data, n2.data, weight)
+            if self.components is not None:
+                index, sets = self.components
+                sets.union(index[n1.data], index[n2.data])
 
     def removeEdge(self, n1, n2):
         if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
             self.adjacency_list[n1.data] = [(neighbor, weight) for neighbor, weight in self.adjacency_list[n1.data] if neighbor != n2.data]
             self.adjacency_list[n2.data] = [(neighbor, weight) for neighbor, weight in self.adjacency_list[n2.data] if neighbor != n1.data]
+            if self.forest is not None:
+                self.forest.delete(n1.data, n2.data)
+            self.components = None
 
     def printGraph(self):
         for node in self.adjacency_list:
@@ -36,41 +69,30 @@ class Graph:
                 print(f"  {neighbor} with weight {weight}\n")      
 
     def importFromFile(self, file):
-        try:
-            with open(file, 'r') as f:
-                graph_content = f.read()
-
-            if "strict graph" not in graph_content:
-                return None
-
-            self.adjacency_list = {}
-            lines = graph_content.split('\n')
-
-            for line in lines:
-                if '--' in line:
-                    nodes, attributes = line.split('[')
-                    node1, node2 = nodes.strip().split('--')
-                    node1 = node1.strip()
-                    node2 = node2.strip()
-                    weight = 1
-                    if 'weight' in attributes:
-                        weight = int(attributes.split('=')[1].strip('];'))
-                    self.addNode(node1)
-                    self.addNode(node2)
-                    self.addEdge(GraphNode(node1), GraphNode(node2), weight)
-
-        except FileNotFoundError:
-            print("File not found.")
-            return None
-        except Exception as e:
-            print("Error occurred while parsing the file:", e)
-            return None
+        '''
+        Streams a "strict graph" DOT file into the graph, replacing its
+        contents. Raises DotParseError (with the line number) on malformed
+        input, in which case the graph is left unchanged.'''
+        adjacency_list = {}
+        for node1, node2, weight in iter_dot_edges(file):
+            if node1 not in adjacency_list:
+                adjacency_list[node1] = []
+            if node2 not in adjacency_list:
+                adjacency_list[node2] = []
+            adjacency_list[node1].append((node2, weight))
+            adjacency_list[node2].append((node1, weight))
+        self.adjacency_list = adjacency_list
+        self.components = None
+        if self.forest is not None:
+            self.forest = DynamicMST.from_graph(self)
         
-# 'find' method for union-find
+# 'find' method for union-find (iterative, with path halving so long
+# chains get flattened and deep trees cannot hit the recursion limit)
     def find(self, parent, i):
-        if parent[i] == i:
-            return i
-        return self.find(parent, parent[i])  
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
 
 # 'union' method for union-find  
     def union(self, parent, rank, nodex, nodey):
@@ -84,48 +106,68 @@ class Graph:
             parent[yroot] = xroot
             rank[xroot] += 1
 
-# full kruskal algorithm implementation w/ union-find
-    def mst(self):
-        parent = {}
-        rank = {}
-        for node in self.adjacency_list:
-            parent[node] = node
-            rank[node] = 0
-        sorted_edges = []
-        for node in self.adjacency_list:
-            for neighbor, weight in self.adjacency_list[node]:
-                sorted_edges.append((node, neighbor, weight))
-        sorted_edges.sort(key = lambda item: item[2])
-        mst_edges = []
-        for edge in sorted_edges:
-            nodex, nodey, weight = edge
-            xroot = self.find(parent, nodex)
-            yroot = self.find(parent, nodey)
-            
-            if (xroot != yroot):
-                mst_edges.append(edge)
-                self.union(parent, rank, xroot, yroot)
-        return mst_edges
+# minimum spanning tree; 'kruskal' (default), 'prim' or 'boruvka' (see mst.py);
+# stats is an optional instrument.Stats the algorithm counts its work into
+    def mst(self, algorithm='kruskal', stats=None):
+        if self.profiler is not None and stats is None:
+            return self.profiler.run('mst', self.mst, algorithm)
+        return minimum_spanning_tree(self.adjacency_list, algorithm, stats)
+
+# per-call stats for mst() (union-find path lengths or heap operations,
+# phase timings; see instrument.py) until graph.profiler is set back to None
+    def instrument(self, profiler=None):
+        self.profiler = profiler if profiler is not None else instrument.Profiler()
+        return self.profiler
+
+# incrementally maintained minimum spanning forest (see dynamic_mst.py):
+# after this, addEdge/removeEdge update self.forest instead of needing a
+# full mst() rerun; self.forest.edges() is the current tree
+    def track_mst(self):
+        self.forest = DynamicMST.from_graph(self)
+        return self.forest
+
+# union-find over the whole graph, reused until an edge or node is removed
+    def _component_sets(self):
+        if self.components is None:
+            index = {label: i for i, label in enumerate(self.adjacency_list)}
+            sets = DisjointSet(len(index))
+            sets.union_many((index[node], index[neighbor])
+                            for node, connections in self.adjacency_list.items()
+                            for neighbor, _ in connections)
+            self.components = (index, sets)
+        return self.components
+
+# connected components as lists of labels
+    def connected_components(self):
+        index, sets = self._component_sets()
+        labels = list(index)
+        return [[labels[i] for i in group] for group in sets.groups()]
+
+# True if there is a path between the two nodes
+    def same_component(self, n1, n2):
+        index, sets = self._component_sets()
+        return sets.connected(index[n1.data], index[n2.data])
 
 # Example usage w/ example graph from ex3.pdf:
-graph = Graph()
-graph.addNode('A')
-graph.addNode('B')
-graph.addNode('C')
-graph.addNode('D')
-graph.addNode('E')
-graph.addNode('F')
-
-graph.addEdge(GraphNode('A'), GraphNode('B'), 3)
-graph.addEdge(GraphNode('A'), GraphNode('D'), 1)
-graph.addEdge(GraphNode('A'), GraphNode('E'), 9)
-graph.addEdge(GraphNode('C'), GraphNode('B'), 12)
-graph.addEdge(GraphNode('C'), GraphNode('D'), 3)
-graph.addEdge(GraphNode('D'), GraphNode('B'), 10)
-graph.addEdge(GraphNode('D'), GraphNode('F'), 2)
-graph.addEdge(GraphNode('F'), GraphNode('E'), 15)
-
-mst = graph.mst()
-print("Minimum spanning tree:")
-for edge in mst:
-    print(edge)
\ No newline at end of file
+if __name__ == "__main__":
+    graph = Graph()
+    graph.addNode('A')
+    graph.addNode('B')
+    graph.addNode('C')
+    graph.addNode('D')
+    graph.addNode('E')
+    graph.addNode('F')
+
+    graph.addEdge(GraphNode('A'), GraphNode('B'), 3)
+    graph.addEdge(GraphNode('A'), GraphNode('D'), 1)
+    graph.addEdge(GraphNode('A'), GraphNode('E'), 9)
+    graph.addEdge(GraphNode('C'), GraphNode('B'), 12)
+    graph.addEdge(GraphNode('C'), GraphNode('D'), 3)
+    graph.addEdge(GraphNode('D'), GraphNode('B'), 10)
+    graph.addEdge(GraphNode('D'), GraphNode('F'), 2)
+    graph.addEdge(GraphNode('F'), GraphNode('E'), 15)
+
+    mst = graph.mst()
+    print("Minimum spanning tree:")
+    for edge in mst:
+        print(edge)
@@ -1,6 +1,12 @@
 # ex4.py
 
 import timeit
+from bitmatrix import DenseGraph2
+from csr import CSRGraph
+from dotio import iter_dot_edges
+import instrument
+from snapshot import load_snapshot, save_snapshot
+from traversal import iter_dfs, list_neighbors, matrix_neighbors
 
 class GraphNode:
     def __init__(self, data):
@@ -9,6 +15,8 @@ class GraphNode:
 class Graph:
     def __init__(self):
         self.adjacency_list = {}
+        # instrument.Profiler, set by instrument(); None means no stats
+        self.profiler = None
 
     def addNode(self, data):
         if data not in self.adjacency_list:
@@ -18,7 +26,11 @@ class Graph:
 
     def removeNode(self, node):
         if node.data in self.adjacency_list:
-            del self.adjacency_list[node.data]
+            # drop the node's entries from its neighbors' lists too, so no
+            # (node, weight) pairs are left dangling
+            for neighbor in {neighbor for neighbor, _ in self.adjacency_list.pop(node.data)}:
+                if neighbor in self.adjacency_list:
+                    self.adjacency_list[neighbor] = [(n, w) for n, w in self.adjacency_list[neighbor] if n != node.data]
 
     def addEdge(self, n1, n2, weight=1):
         if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
@@ -30,6 +42,17 @@ class Graph:
             self.adjacency_list[n1.data] = [(neighbor, weight) for neighbor, weight in self.adjacency_list[n1.data] if neighbor != n2.data]
             self.adjacency_list[n2.data] = [(neighbor, weight) for neighbor, weight in self.adjacency_list[n2.data] if neighbor != n1.data]
 
+    def save_snapshot(self, path):
+        '''Freezes the graph into CSR form and writes it as a binary snapshot.'''
+        save_snapshot(CSRGraph.from_graph(self), path)
+
+    @staticmethod
+    def load_snapshot(path):
+        '''
+        Memory-maps a snapshot written by save_snapshot(). Returns a read-only
+        CSRGraph that supports the same queries as this class.'''
+        return load_snapshot(path)
+
     def printGraph(self):
         for node in self.adjacency_list:
             connections = self.adjacency_list[node]
@@ -38,50 +61,41 @@ class Graph:
                 print(f"  {neighbor} with weight {weight}\n")
 
     def importFromFile(self, file):
-        try:
-            with open(file, 'r') as f:
-                graph_content = f.read()
-
-            if "strict graph" not in graph_content:
-                return None
-
-            self.adjacency_list = {}
-            lines = graph_content.split('\n')
-
-            for line in lines:
-                if '--' in line:
-                    nodes, attributes = line.split('[')
-                    node1, node2 = nodes.strip().split('--')
-                    node1 = node1.strip()
-                    node2 = node2.strip()
-                    weight = 1
-                    if 'weight' in attributes:
-                        weight = int(attributes.split('=')[1].strip('];'))
-                    self.addNode(node1)
-                    self.addNode(node2)
-                    self.addEdge(GraphNode(node1), GraphNode(node2), weight)
-
-        except FileNotFoundError:
-            print("File not found.")
-            return None
-        except Exception as e:
-            print("Error occurred while parsing the file:", e)
-            return None
-
-    def dfs(self, start, visited=None):
-        if visited is None:
-            visited = set()
-        visited.add(start)
-        traversal_order = [start]
-        for neighbor, i in self.adjacency_list[start]:
-            if neighbor not in visited:
-                traversal_order.extend(self.dfs(neighbor, visited))
-        return traversal_order
+        '''
+        Streams a "strict graph" DOT file into the graph, replacing its
+        contents. Raises DotParseError (with the line number) on malformed
+        input, in which case the graph is left unchanged.'''
+        adjacency_list = {}
+        for node1, node2, weight in iter_dot_edges(file):
+            if node1 not in adjacency_list:
+                adjacency_list[node1] = []
+            if node2 not in adjacency_list:
+                adjacency_list[node2] = []
+            adjacency_list[node1].append((node2, weight))
+            adjacency_list[node2].append((node1, weight))
+        self.adjacency_list = adjacency_list
+
+    # iterative pre-order dfs (see traversal.py); same order as the recursive
+    # version, without the recursion limit or the per-level list copies.
+    # stats: optional instrument.Stats to count the traversal into
+    def dfs(self, start, visited=None, stats=None):
+        if self.profiler is not None and stats is None:
+            return self.profiler.run('dfs', self.dfs, start, visited)
+        return list(iter_dfs(list_neighbors(self.adjacency_list), start, visited=visited, stats=stats))
+
+    def instrument(self, profiler=None):
+        '''
+        Collects per-call dfs stats (nodes visited and expanded, edges
+        scanned, max depth, timing; see instrument.py). Set graph.profiler = None to stop.'''
+        self.profiler = profiler if profiler is not None else instrument.Profiler()
+        return self.profiler
 
 
 class Graph2:
     def __init__(self):
         self.adjacency_matrix = {}
+        # instrument.Profiler, set by instrument(); None means no stats
+        self.profiler = None
 
     def addNode(self, data):
         if data not in self.adjacency_matrix:
@@ -114,82 +128,72 @@ class Graph2:
                 print(f"  {neighbor} with weight {weight}\n")
 
     def importFromFile(self, file):
-        try:
-            with open(file, 'r') as f:
-                graph_content = f.read()
-
-            if "strict graph" not in graph_content:
-                return None
-
-            self.adjacency_matrix = {}
-            lines = graph_content.split('\n')
-
-            for line in lines:
-                if '--' in line:
-                    nodes, attributes = line.split('[')
-                    node1, node2 = nodes.strip().split('--')
-                    node1 = node1.strip()
-                    node2 = node2.strip()
-                    weight = 1
-                    if 'weight' in attributes:
-                        weight = int(attributes.split('=')[1].strip('];'))
-                    self.addNode(node1)
-                    self.addNode(node2)
-                    self.addEdge(GraphNode(node1), GraphNode(node2), weight)
-
-        except FileNotFoundError:
-            print("File not found.")
-            return None
-        except Exception as e:
-            print("Error occurred while parsing the file:", e)
-            return None
-
-    def dfs(self, start, visited = None):
-        if visited is None:
-            visited = set()
-        visited.add(start)
-        traversal_order = [start]
-        for neighbor in self.adjacency_matrix[start]:
-            if neighbor not in visited:
-                traversal_order.extend(self.dfs(neighbor, visited))
-        return traversal_order
-
-def measure_dfs_graph1():
-    time_taken = timeit.timeit(lambda: graph1.dfs(list(graph1.adjacency_list.keys())[0]), number = 10)
-    return time_taken
-
-def measure_dfs_graph2():
-    time_taken = timeit.timeit(lambda: graph2.dfs(list(graph2.adjacency_matrix.keys())[0]), number = 10)
-    return time_taken
-
-graph_file = "random.dot"
-
-graph1 = Graph()
-graph2 = Graph2()
-
-graph1.importFromFile(graph_file)
-graph2.importFromFile(graph_file)
-
-execution_times_graph = [measure_dfs_graph1() for i in range(10)]
-execution_times_graph2 = [measure_dfs_graph2() for i in range(10)]
-
-max_time_graph = max(execution_times_graph)
-min_time_graph = min(execution_times_graph)
-avg_time_graph = sum(execution_times_graph) / len(execution_times_graph)
-
-max_time_graph2 = max(execution_times_graph2)
-min_time_graph2 = min(execution_times_graph2)
-avg_time_graph2 = sum(execution_times_graph2) / len(execution_times_graph2)
-
-print("Performance of dfs() for adjacency list graph (Graph class):")
-print(f'Max time: {max_time_graph} seconds')
-print(f'Min time: {min_time_graph} seconds')
-print(f'Average time: {avg_time_graph} seconds')
-
-print("Performance of dfs() for adjacency matrix graph (Graph2 class):")
-print(f'Max time: {max_time_graph2} seconds')
-print(f'Min time: {min_time_graph2} seconds')
-print(f'Average time: {avg_time_graph2} seconds')
+        '''
+        Streams a "strict graph" DOT file into the graph, replacing its
+        contents. Raises DotParseError (with the line number) on malformed
+        input, in which case the graph is left unchanged.'''
+        adjacency_matrix = {}
+        for node1, node2, weight in iter_dot_edges(file):
+            if node1 not in adjacency_matrix:
+                adjacency_matrix[node1] = {}
+            if node2 not in adjacency_matrix:
+                adjacency_matrix[node2] = {}
+            adjacency_matrix[node1][node2] = weight
+            adjacency_matrix[node2][node1] = weight
+        self.adjacency_matrix = adjacency_matrix
+
+    def to_dense(self):
+        '''Copy of this graph in the bitset backed DenseGraph2 (see bitmatrix.py).'''
+        return DenseGraph2.from_graph2(self)
+
+    def dfs(self, start, visited = None, stats=None):
+        if self.profiler is not None and stats is None:
+            return self.profiler.run('dfs', self.dfs, start, visited)
+        return list(iter_dfs(matrix_neighbors(self.adjacency_matrix), start, visited=visited, stats=stats))
+
+    def instrument(self, profiler=None):
+        '''Same as Graph.instrument.'''
+        self.profiler = profiler if profiler is not None else instrument.Profiler()
+        return self.profiler
+
+# Lab timing; see bench.py for the repeatable benchmark suite
+if __name__ == "__main__":
+    def measure_dfs_graph1():
+        time_taken = timeit.timeit(lambda: graph1.dfs(list(graph1.adjacency_list.keys())[0]), number = 10)
+        return time_taken
+
+    def measure_dfs_graph2():
+        time_taken = timeit.timeit(lambda: graph2.dfs(list(graph2.adjacency_matrix.keys())[0]), number = 10)
+        return time_taken
+
+    graph_file = "random.dot"
+
+    graph1 = Graph()
+    graph2 = Graph2()
+
+    graph1.importFromFile(graph_file)
+    graph2.importFromFile(graph_file)
+
+    execution_times_graph = [measure_dfs_graph1() for i in range(10)]
+    execution_times_graph2 = [measure_dfs_graph2() for i in range(10)]
+
+    max_time_graph = max(execution_times_graph)
+    min_time_graph = min(execution_times_graph)
+    avg_time_graph = sum(execution_times_graph) / len(execution_times_graph)
+
+    max_time_graph2 = max(execution_times_graph2)
+    min_time_graph2 = min(execution_times_graph2)
+    avg_time_graph2 = sum(execution_times_graph2) / len(execution_times_graph2)
+
+    print("Performance of dfs() for adjacency list graph (Graph class):")
+    print(f'Max time: {max_time_graph} seconds')
+    print(f'Min time: {min_time_graph} seconds')
+    print(f'Average time: {avg_time_graph} seconds')
+
+    print("Performance of dfs() for adjacency matrix graph (Graph2 class):")
+    print(f'Max time: {max_time_graph2} seconds')
+    print(f'Min time: {min_time_graph2} seconds')
+    print(f'Average time: {avg_time_graph2} seconds')
 
 '''
 Output:
@@ -24,6 +24,9 @@ returns true only if a graph does not contain cycles'''
 
 #Used AI to make the comments on code explanation more concise
 
+from digraph import kahn_toposort
+from dotio import iter_dot_edges
+
 
 class GraphNode:
     def __init__(self, data):
@@ -41,7 +44,11 @@ class Graph:
 
     def removeNode(self, node):
         if node.data in self.adjacency_list:
-            del self.adjacency_list[node.data]
+            # drop the node's entries from its neighbors' lists too, so no
+            # (node, weight) pairs are left dangling
+            for neighbor in {neighbor for neighbor, _ in self.adjacency_list.pop(node.data)}:
+                if neighbor in self.adjacency_list:
+                    self.adjacency_list[neighbor] = [(n, w) for n, w in self.adjacency_list[neighbor] if n != node.data]
 
     def addEdge(self, n1, n2, weight=1):
         if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
@@ -61,39 +68,23 @@ class Graph:
                 print(f"  {neighbor} with weight {weight}\n")
 
     def importFromFile(self, file):
-        try:
-            with open(file, 'r') as f:
-                graph_content = f.read()
-
-            if "strict graph" not in graph_content:
-                return None
-
-            self.adjacency_list = {}
-            lines = graph_content.split('\n')
-
-            for line in lines:
-                if '--' in line:
-                    nodes, attributes = line.split('[')
-                    node1, node2 = nodes.strip().split('--')
-                    node1 = node1.strip()
-                    node2 = node2.strip()
-                    weight = 1
-                    if 'weight' in attributes:
-                        weight = int(attributes.split('=')[1].strip('];'))
-                    self.addNode(node1)
-                    self.addNode(node2)
-                    self.addEdge(GraphNode(node1), GraphNode(node2), weight)
-
-        except FileNotFoundError:
-            print("File not found.")
-            return None
-        except Exception as e:
-            print("Error occurred while parsing the file:", e)
-            return None
+        '''
+        Streams a "strict graph" DOT file into the graph, replacing its
+        contents. Raises DotParseError (with the line number) on malformed
+        input, in which case the graph is left unchanged.'''
+        adjacency_list = {}
+        for node1, node2, weight in iter_dot_edges(file):
+            if node1 not in adjacency_list:
+                adjacency_list[node1] = []
+            if node2 not in adjacency_list:
+                adjacency_list[node2] = []
+            adjacency_list[node1].append((node2, weight))
+            adjacency_list[node2].append((node1, weight))
+        self.adjacency_list = adjacency_list
 
     
     #Method that checks if the graph is a Directed Acyclic Graph (DAG):
-    #uses depth first search
+    #one Kahn pass (see digraph.py)
     def isdag(self):
 
         '''
@@ -102,62 +93,16 @@ class Graph:
         Returns:
             bool: True if the graph is a DAG (does not contain cycles), False otherwise.'''
 
-        visited = set()
-        stack = set()
-        
-        def dfs(node):
-
-            '''
-            Depth-First Search (DFS) helper function to traverse the graph and detect cycles.
-
-            Args:
-                node: The current node being visited.
-
-            Returns:
-                bool: True if a cycle is detected, False otherwise.'''
-
-            visited.add(node)
-            stack.add(node)
-            for neighbor, _ in self.adjacency_list.get(node, []):
-                if neighbor not in visited:
-                    if dfs(neighbor):
-                        return True
-                elif neighbor in stack:
-                    return True
-            stack.remove(node)
-            return False
-        
-        for node in self.adjacency_list:
-            if node not in visited:
-                if dfs(node):
-                    return False
-        return True
+        # addEdge stores both directions, so any edge makes a cycle here;
+        # use digraph.DiGraph for directed graphs
+        return kahn_toposort(self.adjacency_list)[1] is None
 
     def toposort(self):
         '''
         Performs topological sort on the graph if it is a DAG.
         Returns:
             list or None: A list of nodes in topological order if the graph is a DAG, None otherwise.'''
-        if not self.isdag():
-            return None
-        
-        visited = set()
-        result = []
-        
-        def dfs_topo(node):
-            '''
-            Depth-First Search (DFS) helper function to perform topological sort.
-            Args:
-                node: The current node being visited.'''
-
-            visited.add(node)
-            for neighbor, _ in self.adjacency_list.get(node, []):
-                if neighbor not in visited:
-                    dfs_topo(neighbor)
-            result.append(node)
-        
-        for node in self.adjacency_list:
-            if node not in visited:
-                dfs_topo(node)
-        
-        return result[::-1]  # Reversing because we want topological ordering
\ No newline at end of file
+        # Kahn's algorithm checks for cycles and orders the nodes in the
+        # same pass, instead of isdag() followed by a second DFS
+        order, _ = kahn_toposort(self.adjacency_list)
+        return order
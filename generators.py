@@ -0,0 +1,217 @@
+# generators.py
+
+'''
+Seeded synthetic graphs at any scale, streamed as (u, v, weight) triples.
+
+    erdos_renyi(n, p)        G(n, p): every pair is an edge with probability
+                             p. Uses geometric skipping (Batagelj & Brandes):
+                             the gap to the next edge is drawn directly, so
+                             the cost is O(n + edges), not O(n^2)
+    barabasi_albert(n, m)    preferential attachment: each new node links to
+                             m distinct existing nodes, picked with
+                             probability proportional to their degree
+    grid(rows, cols, keep)   road-like lattice: 4-neighbour grid where each
+                             street survives with probability keep
+    random_dag(n, p)         G(n, p) with every edge pointing from the
+                             smaller id to the larger one
+
+Nodes are the integers 0..n-1. Weights come from a weight function called
+with the generator's random.Random; uniform(), exponential() and
+constant() build the usual ones. The default, uniform(1, 100), matches
+random.dot.
+
+Edges are generated lazily and never collected into a list, so
+write_dot() can stream 10^7 edges to a "strict graph" file that
+importFromFile reads, and populate() can feed them straight into any
+in-memory lab graph. Barabási-Albert is the exception: it must remember
+every edge endpoint to sample by degree, which costs 4 bytes each
+(8 above 2^31 nodes).
+'''
+
+from array import array
+import math
+import random
+
+
+class GraphNode:
+    def __init__(self, data):
+        self.data = data
+
+
+# ---- weight distributions ----
+
+def uniform(low=1, high=100):
+    '''Integer weights drawn uniformly from low..high.'''
+    return lambda rng: rng.randint(low, high)
+
+
+def exponential(mean=10.0, integer=True):
+    '''Exponentially distributed weights (at least 1 when integer).'''
+    if integer:
+        return lambda rng: int(rng.expovariate(1 / mean)) + 1
+    return lambda rng: rng.expovariate(1 / mean)
+
+
+def constant(value=1):
+    return lambda rng: value
+
+
+def edge_probability(n, degree):
+    '''p for which G(n, p) has the given expected average degree.'''
+    return min(1.0, degree / (n - 1)) if n > 1 else 0.0
+
+
+# ---- generators ----
+
+def _pairs(n, p, rng):
+    # (v, w) pairs with w < v, each included with probability p
+    if p <= 0 or n < 2:
+        return
+    if p >= 1:
+        for v in range(1, n):
+            for w in range(v):
+                yield v, w
+        return
+    log_q = math.log(1 - p)
+    random_ = rng.random
+    log = math.log
+    v, w = 1, -1
+    while v < n:
+        w += 1 + int(log(1 - random_()) / log_q)
+        while w >= v and v < n:
+            w -= v
+            v += 1
+        if v < n:
+            yield v, w
+
+
+def erdos_renyi(n, p, seed=None, weight=None):
+    '''Yields the edges of an undirected G(n, p) graph as (u, v, weight), u > v.'''
+    rng = random.Random(seed)
+    weight = weight or uniform()
+    for v, w in _pairs(n, p, rng):
+        yield v, w, weight(rng)
+
+
+def random_dag(n, p, seed=None, weight=None):
+    '''Yields the edges u -> v (u < v) of a random DAG; ids are a topological order.'''
+    rng = random.Random(seed)
+    weight = weight or uniform()
+    for v, w in _pairs(n, p, rng):
+        yield w, v, weight(rng)
+
+
+def barabasi_albert(n, m, seed=None, weight=None):
+    '''
+    Yields the edges of a Barabási-Albert graph: nodes 0..m-1 start
+    unconnected and node m links to all of them; from then on node i links
+    to m distinct earlier nodes chosen by degree.'''
+    if m < 1 or n <= m:
+        raise ValueError(f"need 1 <= m < n, got n={n}, m={m}")
+    rng = random.Random(seed)
+    weight = weight or uniform()
+    # every edge endpoint once: a uniform pick from it is a pick by degree
+    endpoints = array('i' if n < 2 ** 31 else 'q')
+    for target in range(m):
+        yield m, target, weight(rng)
+        endpoints.append(m)
+        endpoints.append(target)
+    randrange = rng.randrange
+    for node in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(endpoints[randrange(len(endpoints))])
+        for target in targets:
+            yield node, target, weight(rng)
+            endpoints.append(node)
+            endpoints.append(target)
+
+
+def grid(rows, cols, keep=1.0, seed=None, weight=None):
+    '''
+    Yields the streets of a rows x cols lattice (node r * cols + c), each
+    kept with probability keep.'''
+    rng = random.Random(seed)
+    weight = weight or uniform()
+    random_ = rng.random
+    for r in range(rows):
+        base = r * cols
+        for c in range(cols):
+            node = base + c
+            if c + 1 < cols and (keep >= 1 or random_() < keep):
+                yield node, node + 1, weight(rng)
+            if r + 1 < rows and (keep >= 1 or random_() < keep):
+                yield node, node + cols, weight(rng)
+
+
+# ---- output ----
+
+def write_dot(edges, file, directed=False):
+    '''
+    Streams edges to a DOT file in the layout of random.dot ("strict graph"
+    with "--" edges, or "digraph" with "->" when directed). Returns the
+    number of edges written.'''
+    header, op = ("digraph G {\n", "->") if directed else ("strict graph G {\n", "--")
+    count = 0
+    with open(file, 'w', buffering=1 << 20) as out:
+        out.write(header)
+        write = out.write
+        for u, v, weight in edges:
+            write(f"\t{u} {op} {v}\t[weight={weight}];\n")
+            count += 1
+        out.write("}\n")
+    return count
+
+
+def populate(graph, edges, nodes=None):
+    '''
+    Adds edges (and first the labels in nodes, so isolated nodes exist too)
+    to any lab graph through its addNode/addEdge methods, or add_nodes/
+    add_edges when it has them. Returns graph.'''
+    if hasattr(graph, 'add_edges'):
+        if nodes is not None:
+            graph.add_nodes(nodes)
+        graph.add_edges(edges)
+        return graph
+    if nodes is not None:
+        for node in nodes:
+            graph.addNode(node)
+    add_node, add_edge = graph.addNode, graph.addEdge
+    for u, v, weight in edges:
+        add_node(u)
+        add_node(v)
+        add_edge(GraphNode(u), GraphNode(v), weight)
+    return graph
+
+
+# python generators.py er|ba|grid|dag --nodes N [--degree D] [--seed S] -o out.dot
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Write a synthetic graph as DOT.")
+    parser.add_argument("kind", choices=("er", "ba", "grid", "dag"))
+    parser.add_argument("--nodes", type=int, default=1000, help="node count (grid: rounded to a square)")
+    parser.add_argument("--degree", type=float, default=4, help="average degree (ba: 2 * m)")
+    parser.add_argument("--keep", type=float, default=0.9, help="grid: fraction of streets kept")
+    parser.add_argument("--weights", choices=("uniform", "exponential", "constant"), default="uniform")
+    parser.add_argument("--seed", type=int, default=338)
+    parser.add_argument("-o", "--output", default="generated.dot")
+    args = parser.parse_args()
+
+    weight = {"uniform": uniform, "exponential": exponential, "constant": constant}[args.weights]()
+    n = args.nodes
+    if args.kind == "er":
+        edges = erdos_renyi(n, edge_probability(n, args.degree), args.seed, weight)
+    elif args.kind == "dag":
+        edges = random_dag(n, edge_probability(n, args.degree), args.seed, weight)
+    elif args.kind == "ba":
+        edges = barabasi_albert(n, max(1, round(args.degree / 2)), args.seed, weight)
+    else:
+        side = max(1, round(math.sqrt(n)))
+        edges = grid(side, side, args.keep, args.seed, weight)
+
+    start = time.perf_counter()
+    count = write_dot(edges, args.output, directed=args.kind == "dag")
+    elapsed = time.perf_counter() - start
+    print(f"{count} edges to {args.output} in {elapsed:.2f} s ({count / elapsed:,.0f} edges/s)")
@@ -0,0 +1,361 @@
+# indexed.py
+
+'''
+Graph with indexed adjacency lists for mutation-heavy workloads.
+
+adjacency_list has the usual layout (label -> list of (neighbor, weight)),
+so code that walks adjacency_list directly (sssp, mst, traversal,
+CSRGraph.from_graph, ...) runs on it unchanged. It is not a Graph
+subclass, though: of Graph's methods only the mutators, cachedSP,
+printGraph and importFromFile exist here. Next to adjacency_list,
+positions[u][v] records where v sits in u's list. That gives:
+
+    addEdge     O(1)    (an existing edge just gets its weight updated)
+    removeEdge  O(1)    swap the entry with the last one and pop
+    removeNode  O(deg)  one O(1) removal per neighbor, both directions
+
+The price is that removals reorder a node's list, and parallel edges are
+not kept: like a "strict graph" DOT file, there is at most one edge per
+pair of nodes.
+
+positions is built lazily: a node's index is made from its list the first
+time something needs it (a removal, hasEdge, weight, an addEdge outside a
+batch), and dropped again whenever a batch appends to the list.
+
+Bulk loads go through add_nodes/add_edges/remove_edges or a
+`with graph.batch():` block. Inside a batch, new edges are only appended,
+without touching positions, and the version that keys the shortest path
+cache is bumped once per batch instead of once per edge. A bulk load
+therefore costs about what the plain Graph pays and builds no index at
+all; nodes that are never edited afterwards never get one. Parallel
+entries a batch appended are collapsed (last weight wins) when the node is
+next indexed. If the block raises, every node it touched is restored.
+'''
+
+from contextlib import contextmanager
+from operator import itemgetter
+
+from dotio import iter_dot_edges
+from spcache import SPCache
+from sssp import dijkstra
+
+
+class GraphNode:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Positions(dict):
+    '''node -> {neighbor: index in the node's list}, built on first lookup.'''
+
+    def __init__(self, adjacency_list):
+        super().__init__()
+        self.adjacency_list = adjacency_list
+
+    def __missing__(self, node):
+        # a batch may have appended parallel entries: collapse them first
+        # (last weight wins); unknown nodes raise KeyError here
+        connections = self.adjacency_list[node]
+        positions = dict(zip(map(itemgetter(0), connections), range(len(connections))))
+        if len(positions) != len(connections):
+            latest = dict(connections)
+            connections[:] = latest.items()
+            positions = {neighbor: k for k, neighbor in enumerate(latest)}
+        self[node] = positions
+        return positions
+
+
+class _Batch:
+    def __init__(self):
+        self.dirty = set()   # nodes whose lists the batch appends to
+        # node -> (connections, positions or None) before the batch, or None if new
+        self.undo = {}
+
+
+class IndexedGraph:
+    def __init__(self, cache_entries=128, cache_bytes=None):
+        self.adjacency_list = {}
+        self.positions = _Positions(self.adjacency_list)
+        # bumped by every mutation (once per batch); keys the cache
+        self.version = 0
+        self.sp_cache = SPCache(cache_entries, cache_bytes)
+        self._batch = None
+
+    def addNode(self, data):
+        if data not in self.adjacency_list:
+            self._touch(data)
+            self.adjacency_list[data] = []
+            self.positions[data] = {}
+            self._changed()
+            return GraphNode(data)
+        return None
+
+    def removeNode(self, node):
+        if node.data not in self.adjacency_list:
+            return
+        self._touch(node.data)
+        self._flush(node.data)
+        self.positions[node.data]  # indexing collapses parallel entries
+        for neighbor, _ in self.adjacency_list[node.data]:
+            if neighbor != node.data:
+                self._touch(neighbor)
+                self._flush(neighbor)
+                self._unlink(neighbor, node.data)
+        del self.adjacency_list[node.data]
+        self.positions.pop(node.data, None)
+        self._changed()
+
+    def addEdge(self, n1, n2, weight=1):
+        if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
+            self._add_edge(n1.data, n2.data, weight)
+            self._changed()
+
+    def removeEdge(self, n1, n2):
+        if n1.data in self.adjacency_list and n2.data in self.adjacency_list:
+            if self._remove_edge(n1.data, n2.data):
+                self._changed()
+
+    # ---- bulk mutation ----
+
+    @contextmanager
+    def batch(self):
+        '''
+        Groups mutations into one transaction: indexes are rebuilt and the
+        version bumped once on exit; on an exception every touched node is
+        restored and the exception re-raised. Nested batches join the
+        outermost one.'''
+        if self._batch is not None:
+            yield self
+            return
+        self._batch = _Batch()
+        try:
+            yield self
+        except BaseException:
+            self._rollback()
+            raise
+        else:
+            # indexes built during the batch miss later appends
+            pop = self.positions.pop
+            for node in self._batch.dirty:
+                pop(node, None)
+            changed = bool(self._batch.undo)
+            self._batch = None
+            if changed:
+                self._changed()
+        finally:
+            self._batch = None
+
+    def add_nodes(self, labels):
+        with self.batch():
+            adjacency_list = self.adjacency_list
+            for label in labels:
+                if label not in adjacency_list:
+                    self._touch(label)
+                    adjacency_list[label] = []
+
+    def add_edges(self, edges):
+        '''Adds (u, v, weight) label triples; missing nodes are created.'''
+        with self.batch():
+            adjacency_list = self.adjacency_list
+            if isinstance(edges, list):
+                # every endpoint is known up front: prepare them all in one
+                # pass, then the loop below is nothing but appends
+                labels = set(map(itemgetter(0), edges))
+                labels.update(map(itemgetter(1), edges))
+                self._prepare(labels)
+                for u, v, weight in edges:
+                    adjacency_list[u].append((v, weight))
+                    if u != v:
+                        adjacency_list[v].append((u, weight))
+                return
+            dirty, prepare = self._batch.dirty, self._prepare
+            for u, v, weight in edges:
+                # a node is prepared (undo state recorded, created if needed,
+                # marked dirty) the first time it shows up; later edges skip
+                # straight to the append
+                if u not in dirty:
+                    prepare((u,))
+                if v not in dirty:
+                    prepare((v,))
+                adjacency_list[u].append((v, weight))
+                if u != v:
+                    adjacency_list[v].append((u, weight))
+
+    def remove_edges(self, pairs):
+        '''Removes the edge of every (u, v) pair; missing edges are ignored.'''
+        with self.batch():
+            adjacency_list = self.adjacency_list
+            for u, v, *_ in pairs:
+                if u in adjacency_list and v in adjacency_list:
+                    self._remove_edge(u, v)
+
+    # ---- internals ----
+
+    def _changed(self):
+        if self._batch is None:
+            self.version += 1
+
+    def _touch(self, node, create=False):
+        # remember a node's state the first time a batch changes it
+        if self._batch is not None and node not in self._batch.undo:
+            if node in self.adjacency_list:
+                positions = self.positions.get(node)
+                self._batch.undo[node] = (list(self.adjacency_list[node]),
+                                          None if positions is None else dict(positions))
+            else:
+                self._batch.undo[node] = None
+        if create and node not in self.adjacency_list:
+            self.adjacency_list[node] = []
+
+    def _prepare(self, labels):
+        # _touch(label, create=True) for many labels before appending to
+        # them: nodes the batch creates need no undo copy (rollback just
+        # drops them), and existing ones lose their now stale index, which
+        # can serve as the undo copy as is
+        adjacency_list, pop = self.adjacency_list, self.positions.pop
+        undo = self._batch.undo
+        for label in labels:
+            connections = adjacency_list.get(label)
+            if connections is None:
+                undo.setdefault(label, None)
+                adjacency_list[label] = []
+            elif label not in undo:
+                undo[label] = (list(connections), pop(label, None))
+            else:
+                pop(label, None)
+        self._batch.dirty.update(labels)
+
+    def _flush(self, node):
+        # before editing a node in place: drop an index built before the
+        # batch's latest appends, so the next lookup rebuilds it
+        if self._batch is not None and node in self._batch.dirty:
+            self._batch.dirty.discard(node)
+            self.positions.pop(node, None)
+
+    def _rollback(self):
+        for node, saved in self._batch.undo.items():
+            self.positions.pop(node, None)
+            if saved is None:
+                self.adjacency_list.pop(node, None)
+            else:
+                self.adjacency_list[node], positions = saved
+                if positions is not None:
+                    self.positions[node] = positions
+
+    def _add_edge(self, u, v, weight):
+        for node in (u, v):
+            self._touch(node)
+            self._flush(node)
+        self._link(u, v, weight)
+        if u != v:
+            self._link(v, u, weight)
+
+    def _remove_edge(self, u, v):
+        for node in (u, v):
+            self._flush(node)
+        if v not in self.positions[u]:
+            return False
+        self._touch(u)
+        self._touch(v)
+        self._unlink(u, v)
+        if u != v:
+            self._unlink(v, u)
+        return True
+
+    def hasEdge(self, n1, n2):
+        return n1.data in self.adjacency_list and n2.data in self.positions[n1.data]
+
+    def weight(self, n1, n2):
+        return self.adjacency_list[n1.data][self.positions[n1.data][n2.data]][1]
+
+    def _link(self, u, v, weight):
+        positions = self.positions[u]
+        connections = self.adjacency_list[u]
+        k = positions.get(v)
+        if k is None:
+            positions[v] = len(connections)
+            connections.append((v, weight))
+        else:
+            connections[k] = (v, weight)
+
+    def _unlink(self, u, v):
+        # move u's last entry into v's slot, then drop the last slot
+        positions = self.positions[u]
+        connections = self.adjacency_list[u]
+        k = positions.pop(v)
+        last = connections.pop()
+        if k < len(connections):
+            connections[k] = last
+            positions[last[0]] = k
+
+    def cachedSP(self, node):
+        '''
+        Dijkstra from node through the LRU cache; see Graph.cachedSP in
+        ex2.py. Inside a batch the cache is bypassed, since the version is
+        only bumped when the batch commits.'''
+        if self._batch is not None:
+            return dijkstra(self.adjacency_list, node.data)
+        return self.sp_cache.get(node.data, self.version, lambda source: dijkstra(self.adjacency_list, source))
+
+    def printGraph(self):
+        for node in self.adjacency_list:
+            connections = self.adjacency_list[node]
+            print(f"Node {node} connects to:")
+            for neighbor, weight in connections:
+                print(f"  {neighbor} with weight {weight}\n")
+
+    def importFromFile(self, file):
+        '''
+        Streams a "strict graph" DOT file into the graph, replacing its
+        contents. Raises DotParseError (with the line number) on malformed
+        input, in which case the graph is left unchanged.'''
+        graph = IndexedGraph()
+        graph.add_edges(iter_dot_edges(file))
+        self.adjacency_list = graph.adjacency_list
+        self.positions = graph.positions
+        self._changed()
+
+
+# Churn and bulk load comparison with the list based Graph:
+# python indexed.py [rounds] [edges]
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from ex2 import Graph, GraphNode as Node
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+    random.seed(338)
+    for cls in (Graph, IndexedGraph):
+        graph = cls()
+        graph.importFromFile("random.dot")
+        # densify so per-node degree matters
+        labels = list(graph.adjacency_list)
+        for _ in range(20 * len(labels)):
+            u, v = random.sample(labels, 2)
+            graph.addEdge(Node(u), Node(v), random.randint(1, 100))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            u, v = random.sample(labels, 2)
+            graph.removeEdge(Node(u), Node(v))
+            graph.addEdge(Node(u), Node(v), random.randint(1, 100))
+        elapsed = time.perf_counter() - start
+        print(f"{cls.__name__:>12}: {elapsed / rounds * 1e6:6.2f} us per remove+add")
+
+    n = m // 4
+    edges = [(random.randrange(n), random.randrange(n), random.randint(1, 100)) for _ in range(m)]
+    loads = {
+        "Graph.addEdge loop": (Graph, lambda g: [g.addNode(i) for i in range(n)]
+                               and [g.addEdge(Node(u), Node(v), w) for u, v, w in edges]),
+        "IndexedGraph.addEdge loop": (IndexedGraph, lambda g: [g.addNode(i) for i in range(n)]
+                                      and [g.addEdge(Node(u), Node(v), w) for u, v, w in edges]),
+        "IndexedGraph.add_edges": (IndexedGraph, lambda g: g.add_edges(edges)),
+        "add_edges, iterator": (IndexedGraph, lambda g: g.add_edges(iter(edges))),
+    }
+    for name, (cls, load) in loads.items():
+        graph = cls()
+        start = time.perf_counter()
+        load(graph)
+        print(f"{name:>26}: {m / (time.perf_counter() - start):12,.0f} edges/s")
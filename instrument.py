@@ -0,0 +1,276 @@
+# instrument.py
+
+'''
+Opt-in instrumentation for fastSP, mst and dfs.
+
+fastSP, mst and dfs (and the sssp, mst and traversal functions behind
+them) take an optional stats argument. Given a Stats, they swap a few of
+the objects they work with for the counting stand-ins below: the
+adjacency_list lookups, the priority queue's push and pop, the union-find
+and the neighbors() function. The algorithm itself is the same code either
+way, and with stats=None the only extra work is a `stats is not None` test
+or two per call, so it can stay in the code permanently.
+
+Attaching a Profiler (graph.instrument()) makes those methods create a
+Stats for every call. Each Stats holds:
+
+    counters   fastSP (every queue): nodes_settled, edges_scanned,
+                   queue_pushes, queue_pops, max_queue; stale pops are
+                   queue_pops - nodes_settled
+               mst: finds, find_path_total, find_path_max (union-find
+                   links followed per find) and unions; kruskal also edges,
+                   prim the queue counters instead of the union-find ones
+               dfs: nodes_visited, nodes_expanded, edges_scanned, max_depth
+    phases     nanoseconds per phase where an algorithm has several (e.g.
+               dedup / sort / union for kruskal), plus total_ns for the
+               whole call
+
+The Profiler keeps the most recent Stats and hands each one to an optional
+callback, e.g. to ship it to a metrics system.
+'''
+
+from collections import deque
+import heapq
+import time
+
+from disjointset import DisjointSet
+
+
+class Stats:
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.counters = {}
+        self.phases = {}
+        self.total_ns = 0
+        self._lap = time.perf_counter_ns()
+
+    def lap(self, phase):
+        '''Records the time since the previous lap (or since creation) as phase.'''
+        now = time.perf_counter_ns()
+        self.phases[phase] = now - self._lap
+        self._lap = now
+
+    def as_dict(self):
+        return {"algorithm": self.algorithm, "total_ns": self.total_ns,
+                "counters": dict(self.counters), "phases": dict(self.phases)}
+
+    def __repr__(self):
+        return f"Stats({self.as_dict()!r})"
+
+
+class Profiler:
+    def __init__(self, callback=None, history=1000):
+        self.callback = callback
+        self.history = deque(maxlen=history)
+
+    def run(self, algorithm, function, *args):
+        '''Calls function(*args, stats), records the stats and returns the function's result.'''
+        stats = Stats(algorithm)
+        start = time.perf_counter_ns()
+        result = function(*args, stats)
+        stats.total_ns = time.perf_counter_ns() - start
+        self.history.append(stats)
+        if self.callback is not None:
+            self.callback(stats)
+        return result
+
+    def last(self, algorithm=None):
+        '''Most recent Stats (for the given algorithm), or None.'''
+        for stats in reversed(self.history):
+            if algorithm is None or stats.algorithm == algorithm:
+                return stats
+        return None
+
+
+class CountingAdjacency:
+    '''
+    adjacency_list stand-in for Dijkstra: every lookup is one settled node,
+    and counts the edges it hands back as scanned.'''
+
+    def __init__(self, adjacency_list, counters):
+        self.adjacency_list = adjacency_list
+        self.counters = counters
+        counters.update(nodes_settled=0, edges_scanned=0)
+
+    def __iter__(self):
+        return iter(self.adjacency_list)
+
+    def __len__(self):
+        return len(self.adjacency_list)
+
+    def __getitem__(self, node):
+        connections = self.adjacency_list[node]
+        self.counters['nodes_settled'] += 1
+        self.counters['edges_scanned'] += len(connections)
+        return connections
+
+
+class _Bucket(list):
+    # a list whose append and pop can be replaced per instance
+    pass
+
+
+class QueueCounter:
+    '''
+    Wraps the push and pop operations of a priority queue, whatever its
+    kind (heapq functions, RadixHeap methods, the buckets of Dial's queue),
+    to count queue_pushes, queue_pops and the largest size, max_queue.'''
+
+    def __init__(self, counters):
+        self.counters = counters
+        self.size = 0
+        counters.update(queue_pushes=0, queue_pops=0, max_queue=0)
+
+    def _pushed(self, count):
+        self.counters['queue_pushes'] += count
+        self.size += count
+        if self.size > self.counters['max_queue']:
+            self.counters['max_queue'] = self.size
+
+    def push(self, function):
+        def push(*args):
+            self._pushed(1)
+            return function(*args)
+        return push
+
+    def pop(self, function):
+        def pop(*args):
+            self.counters['queue_pops'] += 1
+            self.size -= 1
+            return function(*args)
+        return pop
+
+    def heapify(self, function):
+        '''Counts every entry of a list turned into a heap as pushed.'''
+        def heapify(heap):
+            self._pushed(len(heap))
+            return function(heap)
+        return heapify
+
+    def bucket(self):
+        '''An empty list whose append and pop count as pushes and pops.'''
+        bucket = _Bucket()
+        bucket.append = self.push(bucket.append)
+        bucket.pop = self.pop(bucket.pop)
+        return bucket
+
+    def heap_functions(self):
+        '''Counting stand-ins for (heapq.heappush, heapq.heappop).'''
+        return self.push(heapq.heappush), self.pop(heapq.heappop)
+
+
+class CountingDisjointSet(DisjointSet):
+    '''DisjointSet that counts finds, the links each one follows, and unions.'''
+
+    def __init__(self, n, counters):
+        super().__init__(n)
+        self.counters = counters
+        counters.update(finds=0, find_path_total=0, find_path_max=0, unions=0)
+
+    def find(self, i):
+        parent = self.parent
+        length = 0
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+            length += 1
+        counters = self.counters
+        counters['finds'] += 1
+        counters['find_path_total'] += length
+        if length > counters['find_path_max']:
+            counters['find_path_max'] = length
+        return i
+
+    def union(self, x, y):
+        merged = super().union(x, y)
+        self.counters['unions'] += merged
+        return merged
+
+
+def counting_neighbors(neighbors, counters):
+    '''
+    neighbors() stand-in for the traversals: counts the nodes expanded, the
+    neighbors handed out (edges_scanned) and the deepest nesting of
+    expansions still in progress (max_depth, 0 for the start alone).'''
+    counters.update(nodes_expanded=0, edges_scanned=0, max_depth=0)
+    open_expansions = 0
+
+    def counted(node):
+        nonlocal open_expansions
+        counters['nodes_expanded'] += 1
+        open_expansions += 1
+        if open_expansions - 1 > counters['max_depth']:
+            counters['max_depth'] = open_expansions - 1
+        for neighbor in neighbors(node):
+            counters['edges_scanned'] += 1
+            yield neighbor
+        open_expansions -= 1
+    return counted
+
+
+# Cost of the hook when disabled and when enabled: python instrument.py
+if __name__ == "__main__":
+    import timeit
+
+    from ex2 import Graph, GraphNode
+    import ex3
+    import ex4
+    from mst import ALGORITHMS
+    from sssp import QUEUES
+
+    # stats only swap in counting stand-ins: results must not change, and
+    # the counters have to add up
+    graph = Graph()
+    graph.importFromFile("random.dot")
+    source = GraphNode(next(iter(graph.adjacency_list)))
+    for queue in QUEUES:
+        plain = graph.fastSP(source, queue)
+        stats = Stats('fastSP')
+        assert graph.fastSP(source, queue, None, stats) == plain, queue
+        counters = stats.counters
+        assert counters['nodes_settled'] == sum(d != float('inf') for d in plain.values()), queue
+        assert counters['queue_pushes'] == counters['queue_pops'] >= counters['nodes_settled'], queue
+    tree_graph = ex3.Graph()
+    tree_graph.importFromFile("random.dot")
+    for algorithm in ALGORITHMS:
+        plain = tree_graph.mst(algorithm)
+        stats = Stats('mst')
+        assert tree_graph.mst(algorithm, stats) == plain, algorithm
+        if algorithm != 'prim':
+            assert stats.counters['unions'] == len(plain), algorithm
+    for cls in (ex4.Graph, ex4.Graph2):
+        dfs_graph = cls()
+        dfs_graph.importFromFile("random.dot")
+        start = next(iter(getattr(dfs_graph, 'adjacency_list', None) or dfs_graph.adjacency_matrix))
+        plain = dfs_graph.dfs(start)
+        stats = Stats('dfs')
+        assert dfs_graph.dfs(start, None, stats) == plain, cls.__name__
+        assert stats.counters['nodes_visited'] == stats.counters['nodes_expanded'] == len(plain), cls.__name__
+
+    def plain():
+        # fastSP's body without the hook, for reference
+        adjacency_list = graph.adjacency_list
+        distances = {key: float('inf') for key in adjacency_list}
+        distances[source.data] = 0
+        unvisited = [(0, source.data)]
+        while unvisited:
+            curr_dist, curr_node = heapq.heappop(unvisited)
+            if curr_dist > distances[curr_node]:
+                continue
+            for neighbor, weight in adjacency_list[curr_node]:
+                alt = curr_dist + weight
+                if alt < distances[neighbor]:
+                    distances[neighbor] = alt
+                    heapq.heappush(unvisited, (alt, neighbor))
+        return distances
+
+    runs = 200
+    t_plain = min(timeit.repeat(plain, number=runs, repeat=5)) / runs
+    t_off = min(timeit.repeat(lambda: graph.fastSP(source), number=runs, repeat=5)) / runs
+    profiler = graph.instrument()
+    t_on = min(timeit.repeat(lambda: graph.fastSP(source), number=runs, repeat=5)) / runs
+    graph.profiler = None
+    print(f"fastSP without hook {t_plain * 1e6:8.1f} us")
+    print(f"   profiler off     {t_off * 1e6:8.1f} us")
+    print(f"   profiler on      {t_on * 1e6:8.1f} us")
+    print(profiler.last("fastSP"))
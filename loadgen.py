@@ -0,0 +1,112 @@
+# loadgen.py
+
+'''
+Load generator for server.py.
+
+Opens --connections connections, each sending one request at a time and
+waiting for its reply (a closed loop), until --requests requests have been
+answered in total. Sources are drawn from the first --sources node labels,
+so a small value makes many requests hit the same source and exercises
+the server's coalescing. Reports throughput and latency percentiles:
+
+    python loadgen.py --port 8338 --connections 32 --requests 5000
+    python loadgen.py --unix /tmp/graph.sock --mix sp=6,point=3,reachable=1
+'''
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from bench import percentile
+
+OPS = ('sp', 'point', 'reachable', 'mst', 'toposort')
+
+
+async def _open(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix, limit=1 << 24)
+    return await asyncio.open_connection(args.host, args.port, limit=1 << 24)
+
+
+async def _call(reader, writer, request):
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def _request(op, labels, rng):
+    if op == 'sp':
+        return {"op": "sp", "source": rng.choice(labels)}
+    if op == 'point':
+        return {"op": "sp", "source": rng.choice(labels), "target": rng.choice(labels)}
+    if op == 'reachable':
+        return {"op": "reachable", "source": rng.choice(labels), "target": rng.choice(labels)}
+    return {"op": op}
+
+
+async def run(args):
+    mix = {}
+    for part in args.mix.split(','):
+        op, _, share = part.partition('=')
+        if op not in OPS:
+            raise SystemExit(f"unknown op {op!r} in --mix, expected one of {OPS}")
+        mix[op] = float(share or 1)
+
+    reader, writer = await _open(args)
+    labels = (await _call(reader, writer, {"op": "nodes"}))["result"]
+    writer.close()
+    if args.sources:
+        labels = labels[:args.sources]
+
+    rng = random.Random(args.seed)
+    ops = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    requests = [dict(_request(op, labels, rng), id=i) for i, op in enumerate(ops)]
+    latencies = []
+    errors = 0
+    queue = iter(requests)
+
+    async def client():
+        nonlocal errors
+        reader, writer = await _open(args)
+        try:
+            for request in queue:
+                start = time.perf_counter_ns()
+                reply = await _call(reader, writer, request)
+                latencies.append(time.perf_counter_ns() - start)
+                errors += not reply["ok"]
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f} s, {errors} errors")
+    print(f"throughput {len(latencies) / elapsed:,.0f} req/s")
+    print("latency   " + "  ".join(f"p{p} {percentile(latencies, p) / 1e6:.2f} ms" for p in (50, 90, 99))
+          + f"  max {latencies[-1] / 1e6:.2f} ms")
+
+    reader, writer = await _open(args)
+    print("server", (await _call(reader, writer, {"op": "stats"}))["result"])
+    writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Closed-loop load generator for server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8338)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mix", default="sp=4,point=4,reachable=2",
+                        help=f"comma separated op=share pairs, ops: {' '.join(OPS)}")
+    parser.add_argument("--sources", type=int, default=None, help="draw sources from this many nodes")
+    parser.add_argument("--seed", type=int, default=338)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
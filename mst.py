@@ -0,0 +1,163 @@
+# mst.py
+
+'''
+Minimum spanning tree (forest) algorithms for the undirected lab graphs.
+
+Graph.addEdge stores every undirected edge twice (once per endpoint), so
+the edge list is deduplicated first: labels get integer ids in
+adjacency_list order and only the copy stored at the smaller id is kept.
+That halves the sort in Kruskal and the scans in Borůvka.
+
+    'kruskal'  sort edges, join components with union-find; O(E log E)
+    'prim'     grow each tree from a heap of crossing edges; O(E log V),
+               good for dense graphs since it never sorts all edges
+    'boruvka'  every component picks its cheapest outgoing edge per round;
+               O(E log V); the per-component scans are independent of each
+               other, which is what makes it the parallel-friendly choice
+
+All of them return a list of (u, v, weight) label triples, and take an
+optional instrument.Stats to count their union-find or heap work into.
+'''
+
+import heapq
+
+from disjointset import DisjointSet
+import instrument
+
+ALGORITHMS = ('kruskal', 'prim', 'boruvka')
+
+
+def undirected_edges(adjacency_list):
+    '''
+    Returns (labels, edges) where edges is a list of (weight, u_id, v_id)
+    with every undirected edge listed once, in adjacency_list order.'''
+    labels = list(adjacency_list)
+    index = {label: i for i, label in enumerate(labels)}
+    edges = []
+    for u, label in enumerate(labels):
+        for neighbor, weight in adjacency_list[label]:
+            v = index[neighbor]
+            if u < v:
+                edges.append((weight, u, v))
+    return labels, edges
+
+
+def _disjoint_set(n, stats):
+    return DisjointSet(n) if stats is None else instrument.CountingDisjointSet(n, stats.counters)
+
+
+def kruskal(adjacency_list, stats=None):
+    labels, edges = undirected_edges(adjacency_list)
+    if stats is not None:
+        stats.lap('dedup')
+    edges.sort(key=lambda item: item[0])
+    if stats is not None:
+        stats.lap('sort')
+    sets = _disjoint_set(len(labels), stats)
+    mst_edges = []
+    for weight, u, v in edges:
+        if sets.union(u, v):
+            mst_edges.append((labels[u], labels[v], weight))
+            if len(mst_edges) == len(labels) - 1:
+                break
+    if stats is not None:
+        stats.lap('union')
+        stats.counters['edges'] = len(edges)
+    return mst_edges
+
+
+def prim(adjacency_list, stats=None):
+    heapify, heappush, heappop = heapq.heapify, heapq.heappush, heapq.heappop
+    if stats is not None:
+        counter = instrument.QueueCounter(stats.counters)
+        heapify = counter.heapify(heapify)
+        heappush, heappop = counter.heap_functions()
+    mst_edges = []
+    visited = set()
+    for root in adjacency_list:
+        if root in visited:
+            continue
+        visited.add(root)
+        heap = [(weight, neighbor, root) for neighbor, weight in adjacency_list[root]]
+        heapify(heap)
+        while heap:
+            weight, node, parent = heappop(heap)
+            if node in visited:
+                continue
+            visited.add(node)
+            mst_edges.append((parent, node, weight))
+            for neighbor, w in adjacency_list[node]:
+                if neighbor not in visited:
+                    heappush(heap, (w, neighbor, node))
+    return mst_edges
+
+
+def boruvka(adjacency_list, stats=None):
+    labels, edges = undirected_edges(adjacency_list)
+    sets = _disjoint_set(len(labels), stats)
+    mst_edges = []
+    while sets.count > 1:
+        # cheapest edge leaving each component; ties broken by edge position
+        # so two components never pick different edges that close a cycle
+        cheapest = {}
+        for k, (weight, u, v) in enumerate(edges):
+            ru, rv = sets.find(u), sets.find(v)
+            if ru == rv:
+                continue
+            for root in (ru, rv):
+                best = cheapest.get(root)
+                if best is None or (weight, k) < (edges[best][0], best):
+                    cheapest[root] = k
+        if not cheapest:
+            break  # remaining components are disconnected
+        for k in set(cheapest.values()):
+            weight, u, v = edges[k]
+            if sets.union(u, v):
+                mst_edges.append((labels[u], labels[v], weight))
+        # drop edges that became internal so later rounds scan less
+        edges = [edge for edge in edges if sets.find(edge[1]) != sets.find(edge[2])]
+    return mst_edges
+
+
+def minimum_spanning_tree(adjacency_list, algorithm='kruskal', stats=None):
+    '''Minimum spanning forest of an adjacency_list with the chosen algorithm.'''
+    if algorithm == 'kruskal':
+        return kruskal(adjacency_list, stats)
+    if algorithm == 'prim':
+        return prim(adjacency_list, stats)
+    if algorithm == 'boruvka':
+        return boruvka(adjacency_list, stats)
+    raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+
+# Picks the fastest algorithm per density: python mst.py [nodes]
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    random.seed(338)
+    for avg_degree in (4, 16, 64, 256):
+        if avg_degree >= n:
+            continue
+        adjacency_list = {i: [] for i in range(n)}
+        seen = set()
+        while len(seen) < n * avg_degree // 2:
+            u, v = random.randrange(n), random.randrange(n)
+            if u != v and (u, v) not in seen and (v, u) not in seen:
+                seen.add((u, v))
+                weight = random.randint(1, 100)
+                adjacency_list[u].append((v, weight))
+                adjacency_list[v].append((u, weight))
+
+        timings = {}
+        totals = set()
+        for algorithm in ALGORITHMS:
+            start = time.perf_counter()
+            tree = minimum_spanning_tree(adjacency_list, algorithm)
+            timings[algorithm] = time.perf_counter() - start
+            totals.add(sum(weight for _, _, weight in tree))
+        assert len(totals) == 1, totals
+        report = "  ".join(f"{name} {t * 1000:7.1f} ms" for name, t in timings.items())
+        print(f"avg degree {avg_degree:3d}: {report}  -> {min(timings, key=timings.get)}")
@@ -0,0 +1,108 @@
+# parallel.py
+
+'''
+All-sources shortest paths fanned out over a process pool.
+
+The graph is frozen into a CSRGraph and handed to each worker exactly once,
+through the pool initializer (with the fork start method it is not even
+copied: workers inherit the parent's pages). Tasks are just source ids, and
+each result comes back as a compact array of distances that is turned into
+a label-keyed dict in the parent as it arrives, so only one distance dict
+has to exist at a time.
+'''
+
+from array import array
+import multiprocessing
+import os
+
+from csr import CSRGraph
+from shm import SharedGraph
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph.graph if isinstance(graph, SharedGraph) else graph
+
+
+def _solve(source):
+    return source, array('d', _worker_graph.distances(source))
+
+
+def _as_csr(graph):
+    return graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+
+
+def _integer_weights(weights):
+    # any buffer (array, memoryview, NumPy array) reports its item format
+    try:
+        return memoryview(weights).format.lstrip('@=<>!') in tuple('bBhHiIlLqQnN')
+    except TypeError:
+        return all(isinstance(weight, int) for weight in weights)
+
+
+def all_sources_sp(graph, sources=None, workers=None, chunksize=8):
+    '''
+    Runs fastSP from every label in sources (default: every node) and yields
+    (source_label, distances) pairs in completion order. distances is the
+    same label -> distance dict fastSP returns.
+
+    Args:
+        graph: a CSRGraph, a shm.SharedGraph (workers attach to the shared
+            block by name instead of receiving a copy) or any dict based
+            lab Graph.
+        sources: labels or GraphNode objects; None means all nodes.
+        workers: pool size, defaults to os.cpu_count(). 1 runs in-process.
+        chunksize: sources handed to a worker per round trip.'''
+    shared = graph if isinstance(graph, SharedGraph) else None
+    graph = shared.graph if shared is not None else _as_csr(graph)
+    labels = graph.labels
+    if sources is None:
+        ids = range(len(labels))
+    else:
+        ids = [graph.node_id(source) for source in sources]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for source in ids:
+            yield labels[source], dict(zip(labels, graph.distances(source)))
+        return
+
+    # distances travel as float64; integer-weighted graphs get ints back like fastSP
+    integral = _integer_weights(graph.weights)
+    inf = float('inf')
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(shared or graph,)) as pool:
+        for source, dist in pool.imap_unordered(_solve, ids, chunksize):
+            if integral:
+                dist = [d if d == inf else int(d) for d in dist]
+            yield labels[source], dict(zip(labels, dist))
+
+
+# Scaling check: python parallel.py [max_workers]
+if __name__ == "__main__":
+    import sys
+    import time
+
+    graph = CSRGraph.from_file("random.dot")
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+
+    # same values and types as fastSP, whatever buffer holds the weights
+    source = graph.labels[0]
+    expected = graph.fastSP(source)
+    for weights in (graph.weights, memoryview(graph.weights), array('i', graph.weights)):
+        copy = CSRGraph(graph.labels, graph.offsets, graph.targets, weights)
+        (_, dist), = all_sources_sp(copy, [source], workers=2)
+        assert dist == expected and all(type(dist[k]) is type(expected[k]) for k in expected)
+
+    print(f"{len(graph)} sources, {graph.num_edges()} edges, {os.cpu_count()} CPUs")
+    baseline = None
+    for workers in sorted({1, 2, 4, 8, max_workers}):
+        if workers > max_workers:
+            continue
+        start = time.perf_counter()
+        for _ in all_sources_sp(graph, workers=workers):
+            pass
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:3d} workers: {elapsed:7.3f} s  speedup {baseline / elapsed:4.2f}x")
@@ -0,0 +1,111 @@
+# scheduler.py
+
+'''
+Runs the nodes of a dependency DAG as tasks on a thread or process pool.
+
+A node is submitted as soon as its last predecessor finishes, not when its
+whole level does, so one slow task only holds back the nodes that really
+depend on it. Readiness is tracked the same way as in Kahn's algorithm
+(digraph.py): a countdown of unfinished predecessors per node, decremented
+as results come in.
+
+The pool is a concurrent.futures Executor: threads (the default) suit
+tasks that wait on I/O or subprocesses; for CPU bound Python tasks pass a
+ProcessPoolExecutor, in which case task and its results must be picklable.
+'''
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from digraph import in_degrees, kahn_toposort
+from dynamic_topo import CycleError
+
+
+def run_dag(graph, task, executor=None):
+    '''
+    Calls task(node) for every node of a directed graph once all of its
+    predecessors have finished, and yields (node, result) pairs in
+    completion order.
+
+    Args:
+        graph: a DiGraph, or anything with a directed adjacency_list.
+        task: function node -> result.
+        executor: a concurrent.futures Executor; by default a
+            ThreadPoolExecutor is created and shut down afterwards.
+
+    Raises:
+        CycleError: before running anything, if the graph has a cycle.
+        Any exception raised by task; tasks not yet started are cancelled.'''
+    adjacency_list = graph.adjacency_list
+    in_degree = getattr(graph, 'in_degree', None)
+    remaining = dict(in_degree) if in_degree is not None else in_degrees(adjacency_list)
+    _, cycle = kahn_toposort(adjacency_list, remaining)
+    if cycle is not None:
+        raise CycleError(cycle)
+
+    owned = executor is None
+    if owned:
+        executor = ThreadPoolExecutor()
+    running = {}
+    try:
+        for node, degree in remaining.items():
+            if degree == 0:
+                running[executor.submit(task, node)] = node
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                result = future.result()
+                for neighbor, _ in adjacency_list[node]:
+                    remaining[neighbor] -= 1
+                    if remaining[neighbor] == 0:
+                        running[executor.submit(task, neighbor)] = neighbor
+                yield node, result
+    finally:
+        for future in running:
+            future.cancel()
+        if owned:
+            executor.shutdown()
+
+
+# Serial walk vs. the scheduler on a random job DAG of sleeping tasks:
+# python scheduler.py [jobs] [workers]
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    from digraph import DiGraph, GraphNode as Node
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    random.seed(338)
+    cost = {job: random.randint(1, 10) / 1000 for job in range(n)}
+    graph = DiGraph()
+    for job in range(n):
+        graph.addNode(job)
+    for job in range(1, n):
+        for dependency in random.sample(range(job), min(job, 2)):
+            # the edge weight is the cost of the job it comes from
+            graph.addEdge(Node(dependency), Node(job), cost[dependency])
+
+    def job(label):
+        time.sleep(cost[label])
+        return label
+
+    levels = graph.toposort_levels()
+    length, path = graph.critical_path()
+    print(f"{n} jobs, {len(levels)} levels, widest level {max(map(len, levels))}")
+    print(f"critical path {len(path)} jobs, {length:.3f} s (+ {cost[path[-1]]:.3f} s for its last job)")
+
+    start = time.perf_counter()
+    for label in graph.toposort():
+        job(label)
+    print(f"serial: {time.perf_counter() - start:.3f} s")
+
+    start = time.perf_counter()
+    finished = {}
+    with ThreadPoolExecutor(workers) as pool:
+        for label, _ in run_dag(graph, job, pool):
+            finished[label] = time.perf_counter()
+    assert all(finished[u] <= finished[v] for u in graph.adjacency_list for v, _ in graph.adjacency_list[u])
+    print(f"run_dag, {workers} threads: {time.perf_counter() - start:.3f} s")
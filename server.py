@@ -0,0 +1,231 @@
+# server.py
+
+'''
+Long-lived graph query server speaking JSON lines over TCP or a Unix socket.
+
+    python server.py random.dot --port 8338
+    python server.py graph.snap --snapshot --unix /tmp/graph.sock
+
+The graph is loaded once, frozen into a CSRGraph (or mapped from a
+snapshot, see snapshot.py), and never changes. Each request is one JSON
+object per line and so is each reply:
+
+    {"id": 1, "op": "sp", "source": "12"}                 distances from 12
+    {"id": 2, "op": "sp", "source": "12", "target": "40"}  one distance
+    {"id": 3, "op": "mst"}                                 {"weight": w, "edges": [...]}
+    {"id": 4, "op": "toposort"}                            order, or null on a cycle
+    {"id": 5, "op": "reachable", "source": "12"}           labels reachable from 12
+    {"id": 6, "op": "reachable", "source": "12", "target": "40"}   true / false
+    {"id": 7, "op": "nodes"}  {"id": 8, "op": "stats"}
+
+    -> {"id": 1, "ok": true, "result": ...}
+    -> {"id": 1, "ok": false, "error": "unknown node '99999'"}
+
+Unreachable distances are null. Requests on one connection are served
+concurrently and answered as they finish, so replies may come back out of
+order; "id" is echoed back to match them up.
+
+Work is keyed by what it computes: ("sp", source), ("reachable", source),
+("mst",), ("toposort",). A request whose key is already being computed
+awaits the same future instead of starting another run, so a burst of
+queries for one source costs one Dijkstra (point queries share the full
+run too). The computing itself happens in a process pool whose workers get
+the graph once through the pool initializer, as in parallel.py, leaving the
+event loop free to accept and parse requests; --workers 0 uses a single
+thread instead. mst and toposort results are kept once computed.
+'''
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import json
+import os
+
+from csr import CSRGraph
+from snapshot import load_snapshot
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _compute(key):
+    graph = _worker_graph
+    op = key[0]
+    if op == 'sp':
+        return graph.distances(key[1])
+    if op == 'reachable':
+        return graph.dfs(graph.labels[key[1]])
+    if op == 'mst':
+        return graph.mst()
+    if op == 'toposort':
+        return graph.toposort()
+    raise ValueError(f"unknown computation {op!r}")
+
+
+class RequestError(Exception):
+    pass
+
+
+class GraphServer:
+    def __init__(self, graph, workers=None):
+        self.graph = graph
+        if workers == 0:
+            self.executor = ThreadPoolExecutor(1, initializer=_init_worker, initargs=(graph,))
+        else:
+            self.executor = ProcessPoolExecutor(workers or os.cpu_count() or 1,
+                                                initializer=_init_worker, initargs=(graph,))
+        self.inflight = {}   # key -> future of the running computation
+        self.memo = {}       # key -> result, for the source-free queries
+        self.counters = {"requests": 0, "errors": 0, "computed": 0, "coalesced": 0, "connections": 0}
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    # ---- computation ----
+
+    async def compute(self, key):
+        '''Result of _compute(key), sharing a run already in flight.'''
+        if key in self.memo:
+            return self.memo[key]
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, _compute, key)
+            self.inflight[key] = future
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+            self.counters["computed"] += 1
+        else:
+            self.counters["coalesced"] += 1
+        # one waiter giving up (e.g. its client went away) must not cancel
+        # the run for everyone else
+        result = await asyncio.shield(future)
+        if key[0] in ('mst', 'toposort'):
+            self.memo[key] = result
+        return result
+
+    def _node_id(self, request, field):
+        if field not in request:
+            raise RequestError(f"missing {field!r}")
+        if not isinstance(request[field], (str, int)) or isinstance(request[field], bool):
+            raise RequestError(f"{field!r} must be a node label (string or integer)")
+        try:
+            return self.graph.node_id(request[field])
+        except KeyError:
+            raise RequestError(f"unknown node {request[field]!r}") from None
+
+    async def answer(self, request):
+        op = request.get("op")
+        labels = self.graph.labels
+        if op == "sp":
+            source = self._node_id(request, "source")
+            target = self._node_id(request, "target") if "target" in request else None
+            distances = await self.compute(("sp", source))
+            inf = float('inf')
+            if target is not None:
+                return None if distances[target] == inf else distances[target]
+            return {label: None if d == inf else d for label, d in zip(labels, distances)}
+        if op == "reachable":
+            source = self._node_id(request, "source")
+            reached = await self.compute(("reachable", source))
+            if "target" in request:
+                return labels[self._node_id(request, "target")] in set(reached)
+            return reached
+        if op == "mst":
+            edges = await self.compute(("mst",))
+            return {"weight": sum(weight for _, _, weight in edges), "edges": edges}
+        if op == "toposort":
+            return await self.compute(("toposort",))
+        if op == "nodes":
+            return list(labels)
+        if op == "stats":
+            return dict(self.counters, nodes=len(self.graph), edges=self.graph.num_edges(),
+                        inflight=len(self.inflight))
+        raise RequestError(f"unknown op {op!r}")
+
+    # ---- protocol ----
+
+    async def _reply(self, line, writer):
+        self.counters["requests"] += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("request must be a JSON object")
+            request_id = request.get("id")
+            reply = {"id": request_id, "ok": True, "result": await self.answer(request)}
+        except (RequestError, ValueError) as error:
+            self.counters["errors"] += 1
+            reply = {"id": request_id, "ok": False, "error": str(error)}
+        except Exception as error:
+            # anything else (e.g. a worker failure) still answers this line,
+            # or the client would wait for its reply forever
+            self.counters["errors"] += 1
+            reply = {"id": request_id, "ok": False, "error": f"internal error: {type(error).__name__}: {error}"}
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        self.counters["connections"] += 1
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._reply(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8338, path=None):
+        '''Serves until cancelled, on a Unix socket if path is given, else on TCP.'''
+        if path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path, limit=1 << 20)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=1 << 20)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve graph queries as JSON lines.")
+    parser.add_argument("file", help="DOT file (or snapshot with --snapshot)")
+    parser.add_argument("--snapshot", action="store_true", help="file is a CSR snapshot (snapshot.py)")
+    parser.add_argument("--directed", action="store_true", help="file is a DOT digraph")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8338)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count; 0 = one thread)")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        graph = load_snapshot(args.file)
+    else:
+        graph = CSRGraph.from_file(args.file, directed=args.directed)
+    server = GraphServer(graph, args.workers)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"{len(graph)} nodes, {graph.num_edges()} edges; listening on {where}", flush=True)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# shm.py
+
+'''
+Frozen graphs published in multiprocessing.shared_memory.
+
+publish() lays a graph out in one shared memory block in the snapshot
+format (snapshot.py). Any process can then attach() to the block by name
+and get a CSRGraph whose offsets, targets and weights are memoryviews into
+the shared pages, so fastSP, dfs, mst, toposort and friends run on it
+without copying. Labels stay lazy too, as with load_snapshot(). A worker
+that attaches therefore adds nothing proportional to the graph, and total
+memory stays close to one copy of the graph however many workers there
+are.
+
+A SharedGraph pickles as its block name, so it can be handed to a Pool
+initializer (or sent through a queue) and is re-attached on the other side:
+
+    with publish(graph) as shared:
+        with multiprocessing.Pool(initializer=init, initargs=(shared,)) as pool:
+            ...
+
+The publishing process owns the block and unlinks it when the context
+exits (or on unlink()); attached processes only close() their mapping.
+'''
+
+from multiprocessing import resource_tracker, shared_memory
+import os
+import time
+
+from csr import CSRGraph
+from snapshot import LabelIndex, LabelTable, parse_snapshot, snapshot_sections
+
+
+def _open_block(name):
+    # attaching must not register the block with the resource tracker, or
+    # the block would be unlinked when this process exits
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # no track argument before Python 3.13
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedGraph:
+    def __init__(self, block, owner=False):
+        self.block = block
+        self.name = block.name
+        self.owner = owner
+        parts = parse_snapshot(block.buf)
+        order = parts["label_order"]
+        labels = LabelTable(parts["label_offsets"], parts["label_blob"])
+        self.graph = CSRGraph(labels, parts["offsets"], parts["targets"], parts["weights"],
+                              directed=parts["directed"], index=LabelIndex(labels, order))
+        # every view into block.buf, released on close()
+        self._views = [parts[key] for key in
+                       ("label_offsets", "label_blob", "offsets", "targets", "weights", "label_order")]
+        # as with load_snapshot(): the graph keeps its backing buffer alive
+        self.graph.buffer = self
+
+    def __reduce__(self):
+        return (attach, (self.name,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.close()
+        finally:
+            # even if a view is still exported and close() fails, the
+            # segment itself must not outlive the owner
+            if self.owner:
+                self.unlink()
+
+    def close(self):
+        '''
+        Unmaps the block from this process. The graph's views are released
+        first, so a graph still referenced elsewhere raises ValueError when
+        used; buffers exported from those views (np.frombuffer and the like)
+        must be dropped by the caller, or this raises BufferError.'''
+        self.graph = None
+        for view in self._views:
+            view.release()
+        self.block.close()
+
+    def unlink(self):
+        '''Frees the block once every process has closed it (owner only).'''
+        self.block.unlink()
+
+
+def publish(graph, name=None):
+    '''
+    Copies graph (a CSRGraph or any dict based lab graph; labels must be
+    str) into a new shared memory block and returns the owning SharedGraph.'''
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_graph(graph)
+    sections = snapshot_sections(graph)
+    size = sum(len(section) for section in sections)
+    block = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+    pos = 0
+    for section in sections:
+        block.buf[pos:pos + len(section)] = section
+        pos += len(section)
+    return SharedGraph(block, owner=True)
+
+
+def attach(name):
+    '''Attaches to a graph published under name; returns a SharedGraph.'''
+    return SharedGraph(_open_block(name))
+
+
+# ---- benchmark workers (module level, so spawned processes can import them) ----
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph.graph if isinstance(graph, SharedGraph) else graph
+
+
+def _pss_kib():
+    # proportional set size: shared pages are split between the processes
+    # mapping them, so summing it over processes is fair
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _sp_and_pss(source):
+    _worker_graph.distances(source)
+    time.sleep(0.2)  # hold on so every worker picks up one task
+    return os.getpid(), _pss_kib()
+
+
+# Memory of spawned workers, pickled CSRGraph vs. shared memory:
+# python shm.py [nodes] [max_workers]
+if __name__ == "__main__":
+    import multiprocessing
+    import sys
+
+    from generators import edge_probability, erdos_renyi
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    edges = ((str(u), str(v), w) for u, v, w in erdos_renyi(n, edge_probability(n, 8), 338))
+    graph = CSRGraph.from_edges(edges)
+    print(f"{len(graph)} nodes, {graph.num_edges()} edges, CSR arrays {graph.nbytes() / 2**20:.1f} MiB")
+    # spawn, so each worker really receives its graph (fork would share the
+    # parent's pages copy-on-write in both cases)
+    context = multiprocessing.get_context("spawn")
+    with publish(graph) as shared:
+        assert shared.graph.fastSP("0") == graph.fastSP("0")
+        for workers in sorted({1, 2, 4, max_workers}):
+            if workers > max_workers:
+                continue
+            for name, payload in (("pickled", graph), ("shared", shared)):
+                start = time.perf_counter()
+                with context.Pool(workers, initializer=_init_worker, initargs=(payload,)) as pool:
+                    pss = dict(pool.map(_sp_and_pss, range(workers), chunksize=1))
+                elapsed = time.perf_counter() - start
+                print(f"{workers:3d} workers {name:>8}: {sum(pss.values()) / 1024:8.1f} MiB PSS total, "
+                      f"{elapsed:.2f} s")
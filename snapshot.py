@@ -0,0 +1,296 @@
+# snapshot.py
+
+'''
+Binary snapshot format for CSRGraph, so scripts can skip re-parsing DOT
+text on every start.
+
+Layout (native byte order, every section aligned to 8 bytes):
+
+    header        magic, format version, flags, node count, entry count,
+                  weight typecode, label blob size
+    label_offsets int64[n + 1]  byte offsets of each label in the blob
+    label_blob    UTF-8 encoded labels back to back
+    offsets       int64[n + 1]  CSR row offsets
+    targets       int32[m]      CSR neighbor ids
+    weights       int64[m] or float64[m]
+    label_order   int32[n]      node ids sorted by their UTF-8 label
+
+load_snapshot() mmaps the file and hands memoryviews over the mapped pages
+to CSRGraph, so nothing is copied: adjacency data is paged in on demand and
+shared through the page cache between every process that opens the same
+snapshot. Labels are not decoded into a list or indexed in a dict either:
+LabelTable decodes a label when it is asked for, and LabelIndex finds a
+label's id by binary search over label_order, so loading costs the same
+whatever the size of the graph. Version 1 snapshots (no label_order) still
+load, with their labels decoded up front.
+'''
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+import mmap
+import struct
+import sys
+
+from csr import CSRGraph
+
+MAGIC = b'CSRSNAP\0'
+FORMAT_VERSION = 2
+FLAG_DIRECTED = 1
+FLAG_BIG_ENDIAN = 2
+
+_HEADER = struct.Struct('=8sIIqqcxxxxxxxq')
+
+
+def _pad(size):
+    return -size % 8
+
+
+def _native_flags(directed):
+    flags = FLAG_DIRECTED if directed else 0
+    if sys.byteorder == 'big':
+        flags |= FLAG_BIG_ENDIAN
+    return flags
+
+
+def _encode_labels(labels):
+    # label_offsets, label_blob and label_order sections
+    encoded = []
+    for label in labels:
+        if not isinstance(label, str):
+            raise TypeError(f"snapshot labels must be str, got {type(label).__name__}")
+        encoded.append(label.encode('utf-8'))
+    label_offsets = array('q', [0])
+    for data in encoded:
+        label_offsets.append(label_offsets[-1] + len(data))
+    order = array('i', sorted(range(len(encoded)), key=encoded.__getitem__))
+    return label_offsets, b''.join(encoded), order
+
+
+class LabelTable(Sequence):
+    '''id -> label over the label_offsets/label_blob sections of a snapshot.'''
+
+    def __init__(self, label_offsets, blob):
+        self._offsets = label_offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("label id out of range")
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8')
+
+    def encoded(self, i):
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+
+
+class LabelIndex:
+    '''label -> id by binary search over ids sorted by encoded label.'''
+
+    def __init__(self, table, order):
+        self._order = order
+        self._keys = _SortedKeys(table, order)
+
+    def __getitem__(self, label):
+        if isinstance(label, str):
+            key = label.encode('utf-8')
+            k = bisect_left(self._keys, key)
+            if k < len(self._order) and self._keys[k] == key:
+                return self._order[k]
+        raise KeyError(label)
+
+    def __contains__(self, label):
+        try:
+            self[label]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, label, default=None):
+        try:
+            return self[label]
+        except KeyError:
+            return default
+
+    def __len__(self):
+        return len(self._order)
+
+
+class _SortedKeys(Sequence):
+    # encoded labels in sorted order, for bisect
+    def __init__(self, table, order):
+        self._table = table
+        self._order = order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, k):
+        return self._table.encoded(self._order[k])
+
+
+def snapshot_sections(graph):
+    '''
+    Returns the list of byte-like sections (header, label table, CSR arrays,
+    padding) that make up a snapshot of graph. graph can be a CSRGraph or any
+    of the dict based lab graphs.'''
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_graph(graph)
+    n = len(graph.labels)
+    m = len(graph.targets)
+    label_offsets, blob, order = _encode_labels(graph.labels)
+    offsets = array('q', graph.offsets)
+    targets = array('i', graph.targets)
+    weights = graph.weights
+    if not isinstance(weights, array):
+        weights = array(getattr(weights, 'format', 'q'), weights)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, _native_flags(graph.directed),
+                          n, m, weights.typecode.encode(), len(blob))
+    sections = []
+    for part in (header, label_offsets, blob, offsets, targets, weights, order):
+        data = memoryview(part).cast('B')
+        sections.append(data)
+        sections.append(bytes(_pad(len(data))))
+    return sections
+
+
+def save_snapshot(graph, path):
+    '''Writes graph to path in the snapshot format.'''
+    with open(path, 'wb') as f:
+        for section in snapshot_sections(graph):
+            f.write(section)
+
+
+def parse_snapshot(buf):
+    '''
+    Validates the snapshot held in buf and returns its parts as a dict:
+    n, m, directed, and zero-copy memoryviews label_offsets, label_blob,
+    offsets, targets, weights, label_order (None in a version 1 snapshot).
+    "end" is the aligned byte position just past the last section.'''
+    view = memoryview(buf).cast('B')
+    if len(view) < _HEADER.size:
+        raise ValueError("buffer too small for a graph snapshot")
+    magic, version, flags, n, m, typecode, blob_size = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("not a graph snapshot (bad magic)")
+    if version not in (1, FORMAT_VERSION):
+        raise ValueError(f"unsupported snapshot version {version}")
+    if bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == 'big'):
+        raise ValueError("snapshot was written with a different byte order")
+    typecode = typecode.decode()
+
+    pos = _HEADER.size
+
+    def take(size):
+        nonlocal pos
+        start = pos
+        pos += size + _pad(size)
+        if pos > len(view):
+            raise ValueError("truncated graph snapshot")
+        return view[start:start + size]
+
+    parts = {"n": n, "m": m, "directed": bool(flags & FLAG_DIRECTED)}
+    parts["label_offsets"] = take(8 * (n + 1)).cast('q')
+    parts["label_blob"] = take(blob_size)
+    parts["offsets"] = take(8 * (n + 1)).cast('q')
+    parts["targets"] = take(4 * m).cast('i')
+    parts["weights"] = take(8 * m).cast(typecode)
+    parts["label_order"] = take(4 * n).cast('i') if version >= 2 else None
+    parts["end"] = pos
+    return parts
+
+
+def graph_from_buffer(buf):
+    '''
+    Builds a CSRGraph whose offsets/targets/weights are zero-copy views into
+    buf (any object supporting the buffer protocol that holds a snapshot).'''
+    parts = parse_snapshot(buf)
+    labels = LabelTable(parts["label_offsets"], parts["label_blob"])
+    if parts["label_order"] is None:
+        labels, index = list(labels), None
+    else:
+        index = LabelIndex(labels, parts["label_order"])
+    return CSRGraph(labels, parts["offsets"], parts["targets"], parts["weights"],
+                    directed=parts["directed"], index=index)
+
+
+def load_snapshot(path):
+    '''
+    Memory-maps a snapshot written by save_snapshot() and returns a frozen
+    CSRGraph over the mapped pages.'''
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    graph = graph_from_buffer(mapped)
+    # the memoryviews keep the mapping alive; keep a handle for callers too
+    graph.buffer = mapped
+    return graph
+
+
+# Cold start comparison: python snapshot.py [copies]
+# Each load runs in a fresh interpreter so import and page-in costs count.
+if __name__ == "__main__":
+    import os
+    import subprocess
+    import tempfile
+
+    from dotio import iter_dot_edges
+
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    base = list(iter_dot_edges("random.dot"))
+
+    # version 1 compatibility: a version 1 snapshot is a version 2 one
+    # without the trailing label_order section
+    graph = CSRGraph.from_edges(base)
+    sections = snapshot_sections(graph)
+    header = bytearray(sections[0])
+    struct.pack_into('=I', header, len(MAGIC), 1)
+    v1 = b''.join([bytes(header)] + [bytes(part) for part in sections[1:-2]])
+    old = graph_from_buffer(v1)
+    assert old.labels == graph.labels and isinstance(old.labels, list)
+    assert all(old.node_id(label) == i for i, label in enumerate(graph.labels))
+    assert old.distances(0) == graph.distances(0)
+    assert parse_snapshot(v1)["end"] == len(v1)
+    workdir = tempfile.mkdtemp()
+    dot_path = os.path.join(workdir, "scaled.dot")
+    snap_path = os.path.join(workdir, "scaled.snap")
+
+    with open(dot_path, 'w') as out:
+        out.write("strict graph G {\n")
+        for c in range(copies):
+            for node1, node2, weight in base:
+                out.write(f"\t{c}_{node1} -- {c}_{node2}\t[weight={weight}];\n")
+        out.write("}\n")
+    save_snapshot(CSRGraph.from_file(dot_path), snap_path)
+
+    child = '''
+import sys, time
+start = time.perf_counter()
+{load}
+graph.adjacency_list['0_0']
+print(time.perf_counter() - start)
+'''
+    loaders = {
+        "text DOT import": "from ex1 import Graph\ngraph = Graph()\ngraph.importFromFile(sys.argv[1])",
+        "CSR from DOT": "from csr import CSRGraph\ngraph = CSRGraph.from_file(sys.argv[1])",
+        "mmap snapshot": "from snapshot import load_snapshot\ngraph = load_snapshot(sys.argv[1])",
+    }
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        print(f"{len(base) * copies} edges")
+        for name, load in loaders.items():
+            path = snap_path if 'snapshot' in name else dot_path
+            out = subprocess.run([sys.executable, "-c", child.format(load=load), path],
+                                 cwd=here, capture_output=True, text=True, check=True)
+            seconds = float(out.stdout.strip().splitlines()[-1])
+            print(f"{name:>16}: {seconds * 1000:8.1f} ms to first lookup")
+    finally:
+        for path in (dot_path, snap_path):
+            os.remove(path)
+        os.rmdir(workdir)
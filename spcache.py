@@ -0,0 +1,103 @@
+# spcache.py
+
+'''
+LRU cache for single-source shortest path results.
+
+Entries are keyed by (source, graph version). Graphs that support caching
+keep an integer `version` that every mutation bumps, so a result computed
+before a change can never be returned after it. When the cache sees a new
+version it drops everything older in one go instead of waiting for LRU
+eviction.
+'''
+
+from collections import OrderedDict
+import sys
+from types import MappingProxyType
+
+
+def estimate_bytes(distances):
+    # dict table plus one boxed number per entry; labels are shared with the
+    # graph so they are not counted
+    return sys.getsizeof(distances) + 32 * len(distances)
+
+
+class SPCache:
+    def __init__(self, max_entries=128, max_bytes=None):
+        '''
+        Args:
+            max_entries: most results kept at once (None for no limit).
+            max_bytes: approximate memory budget for the cached dicts (None
+                for no limit), see estimate_bytes().'''
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+        self.bytes = 0
+
+    def get(self, source, version, compute):
+        '''
+        Returns the cached result for (source, version), calling
+        compute(source) on a miss. Results are handed out as read-only
+        mappings because the same object is shared by every caller.'''
+        if version != self.version:
+            self.clear()
+            self.version = version
+        key = (source, version)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        distances = compute(source)
+        # size the dict itself: getsizeof of the proxy is a constant 40 bytes
+        size = estimate_bytes(distances)
+        result = MappingProxyType(distances)
+        self.entries[key] = (result, size)
+        self.bytes += size
+        self._evict()
+        return result
+
+    def _evict(self):
+        # always keep the entry just added, even if it alone is over budget
+        while len(self.entries) > 1 and (
+                (self.max_entries is not None and len(self.entries) > self.max_entries)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'invalidations': self.invalidations, 'entries': len(self.entries),
+                'bytes': self.bytes}
+
+
+# Eviction under a byte budget: python spcache.py
+if __name__ == "__main__":
+    from ex2 import Graph, GraphNode
+
+    graph = Graph()
+    graph.importFromFile("random.dot")
+    sources = list(graph.adjacency_list)[:10]
+    compute = lambda source: graph.fastSP(GraphNode(source))
+    one = estimate_bytes(compute(sources[0]))
+    cache = SPCache(max_entries=None, max_bytes=3 * one)
+    for source in sources:
+        assert cache.get(source, 0, compute) == compute(source)
+    print(f"{one} bytes per result, budget {cache.max_bytes}: {cache.stats()}")
+    assert len(cache) == 3 and cache.bytes <= cache.max_bytes
+    assert cache.evictions == len(sources) - 3
@@ -0,0 +1,313 @@
+# sssp.py
+
+'''
+Priority queue backends for Dijkstra's algorithm on the lab graphs.
+
+All functions take an adjacency_list (dict of (neighbor, weight) lists,
+like Graph.adjacency_list) and a source label, and return the same
+label -> distance dict as Graph.fastSP.
+
+    'heap'   binary heap (heapq) with lazy deletion; stale entries are
+             skipped when popped instead of being relaxed again
+    'dial'   Dial's bucket queue: a ring of max_weight + 1 buckets indexed by
+             distance, O(1) push/pop; needs small non-negative int weights
+    'radix'  radix heap: buckets by highest bit that differs from the last
+             popped key, amortised O(log C) per pop; needs non-negative
+             int weights
+'''
+
+import heapq
+
+import instrument
+
+QUEUES = ('heap', 'dial', 'radix')
+
+
+def max_edge_weight(adjacency_list):
+    '''Largest edge weight; raises ValueError for non-integer or negative weights.'''
+    largest = 0
+    for connections in adjacency_list.values():
+        for _, weight in connections:
+            if not isinstance(weight, int) or weight < 0:
+                raise ValueError(f"integer queues need non-negative int weights, got {weight!r}")
+            if weight > largest:
+                largest = weight
+    return largest
+
+
+def _heap_sp(adjacency_list, source, counter=None):
+    distances = {key: float('inf') for key in adjacency_list}
+    distances[source] = 0
+    heappush, heappop = heapq.heappush, heapq.heappop
+    if counter is not None:
+        heappush, heappop = counter.heap_functions()
+    unvisited = []
+    heappush(unvisited, (0, source))
+    while unvisited:
+        curr_dist, curr_node = heappop(unvisited)
+        if curr_dist > distances[curr_node]:
+            continue
+        for neighbor, weight in adjacency_list[curr_node]:
+            alt = curr_dist + weight
+            if alt < distances[neighbor]:
+                distances[neighbor] = alt
+                heappush(unvisited, (alt, neighbor))
+    return distances
+
+
+def _dial_sp(adjacency_list, source, max_weight, counter=None):
+    distances = {key: float('inf') for key in adjacency_list}
+    distances[source] = 0
+    # every tentative distance lies in [d, d + max_weight], so a ring of
+    # max_weight + 1 buckets never mixes two different distances
+    size = max_weight + 1
+    bucket = list if counter is None else counter.bucket
+    buckets = [bucket() for _ in range(size)]
+    buckets[0].append(source)
+    pending = 1
+    d = 0
+    while pending:
+        bucket = buckets[d % size]
+        while bucket:
+            curr_node = bucket.pop()
+            pending -= 1
+            if distances[curr_node] != d:
+                continue
+            for neighbor, weight in adjacency_list[curr_node]:
+                alt = d + weight
+                if alt < distances[neighbor]:
+                    distances[neighbor] = alt
+                    buckets[alt % size].append(neighbor)
+                    pending += 1
+        d += 1
+    return distances
+
+
+class RadixHeap:
+    '''
+    Monotone integer priority queue: pushed keys must never be smaller than
+    the last popped key, which always holds for Dijkstra.'''
+
+    def __init__(self):
+        self.last = 0
+        self.size = 0
+        self.buckets = [[] for _ in range(65)]
+
+    def __len__(self):
+        return self.size
+
+    def push(self, key, value):
+        self.buckets[(key ^ self.last).bit_length()].append((key, value))
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            # redistribute the first non-empty bucket around its minimum;
+            # every entry lands in a strictly lower bucket
+            bucket = buckets[i]
+            last = self.last = min(item[0] for item in bucket)
+            for item in bucket:
+                buckets[(item[0] ^ last).bit_length()].append(item)
+            bucket.clear()
+        self.size -= 1
+        return buckets[0].pop()
+
+
+def _radix_sp(adjacency_list, source, counter=None):
+    distances = {key: float('inf') for key in adjacency_list}
+    distances[source] = 0
+    queue = RadixHeap()
+    if counter is not None:
+        queue.push, queue.pop = counter.push(queue.push), counter.pop(queue.pop)
+    queue.push(0, source)
+    while queue.size:
+        curr_dist, curr_node = queue.pop()
+        if curr_dist > distances[curr_node]:
+            continue
+        for neighbor, weight in adjacency_list[curr_node]:
+            alt = curr_dist + weight
+            if alt < distances[neighbor]:
+                distances[neighbor] = alt
+                queue.push(alt, neighbor)
+    return distances
+
+
+def dijkstra(adjacency_list, source, queue='heap', max_weight=None, stats=None):
+    '''
+    Shortest distances from source using the selected queue backend.
+
+    Args:
+        adjacency_list: dict of (neighbor, weight) lists.
+        source: source label.
+        queue: one of QUEUES.
+        max_weight: largest edge weight, for 'dial'. Computed (one pass over
+            the edges) when not given; pass it in for repeated queries.
+        stats: optional instrument.Stats; the search then counts settled
+            nodes, scanned edges and queue operations into it.'''
+    if queue not in QUEUES:
+        raise ValueError(f"unknown queue {queue!r}, expected one of {QUEUES}")
+    if queue == 'dial' and max_weight is None:
+        max_weight = max_edge_weight(adjacency_list)
+    counter = None
+    if stats is not None:
+        adjacency_list = instrument.CountingAdjacency(adjacency_list, stats.counters)
+        counter = instrument.QueueCounter(stats.counters)
+    if queue == 'heap':
+        return _heap_sp(adjacency_list, source, counter)
+    if queue == 'dial':
+        return _dial_sp(adjacency_list, source, max_weight, counter)
+    return _radix_sp(adjacency_list, source, counter)
+
+
+
+def bounded_dijkstra(adjacency_list, source, target=None, radius=None, k=None):
+    '''
+    Dijkstra that stops early. The search ends as soon as target is
+    settled, the next node would be farther than radius, or k nodes have
+    been settled - whichever comes first (unset limits are ignored).
+
+    Returns:
+        (distances, predecessors): distances holds only settled nodes, in
+        settling order; predecessors maps each settled node to its parent
+        on a shortest path (None for the source). Use build_path() to turn
+        it into a path.'''
+    distances = {}
+    predecessors = {source: None}
+    tentative = {source: 0}
+    unvisited = [(0, source)]
+    while unvisited:
+        curr_dist, curr_node = heapq.heappop(unvisited)
+        if curr_node in distances:
+            continue
+        if radius is not None and curr_dist > radius:
+            break
+        distances[curr_node] = curr_dist
+        if curr_node == target or (k is not None and len(distances) >= k):
+            break
+        for neighbor, weight in adjacency_list[curr_node]:
+            alt = curr_dist + weight
+            if neighbor not in distances and alt < tentative.get(neighbor, float('inf')):
+                tentative[neighbor] = alt
+                predecessors[neighbor] = curr_node
+                heapq.heappush(unvisited, (alt, neighbor))
+    return distances, {node: predecessors[node] for node in distances}
+
+
+def bidirectional_dijkstra(adjacency_list, source, target, reverse_adjacency=None):
+    '''
+    Single pair shortest path searching forward from source and backward
+    from target until the two frontiers can no longer improve the best
+    meeting point. reverse_adjacency is only needed for directed graphs;
+    the undirected lab graphs use adjacency_list both ways.
+
+    Returns:
+        (distance, predecessors): distance is inf if target is unreachable;
+        predecessors is a parent map containing the whole source -> target
+        path, so build_path(predecessors, target) works as for the other
+        queries.'''
+    if reverse_adjacency is None:
+        reverse_adjacency = adjacency_list
+    inf = float('inf')
+    if source == target:
+        return 0, {source: None}
+
+    adjacency = (adjacency_list, reverse_adjacency)
+    tentative = ({source: 0}, {target: 0})
+    parents = ({source: None}, {target: None})
+    settled = (set(), set())
+    heaps = ([(0, source)], [(0, target)])
+    best, meeting = inf, None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        # expand the side with the smaller frontier
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        curr_dist, curr_node = heapq.heappop(heaps[side])
+        if curr_node in settled[side]:
+            continue
+        settled[side].add(curr_node)
+        dist, other = tentative[side], tentative[1 - side]
+        for neighbor, weight in adjacency[side][curr_node]:
+            alt = curr_dist + weight
+            if alt < dist.get(neighbor, inf):
+                dist[neighbor] = alt
+                parents[side][neighbor] = curr_node
+                heapq.heappush(heaps[side], (alt, neighbor))
+            if neighbor in other and dist[neighbor] + other[neighbor] < best:
+                best = dist[neighbor] + other[neighbor]
+                meeting = neighbor
+
+    if meeting is None:
+        return inf, {source: None}
+    predecessors = {}
+    node = meeting
+    while node is not None:
+        predecessors[node] = parents[0][node]
+        node = parents[0][node]
+    node = meeting
+    while node != target:
+        predecessors[parents[1][node]] = node
+        node = parents[1][node]
+    return best, predecessors
+
+
+def build_path(predecessors, target):
+    '''Source -> target path from a predecessor map ([] if target was not reached).'''
+    if target not in predecessors:
+        return []
+    path = []
+    node = target
+    while node is not None:
+        path.append(node)
+        node = predecessors[node]
+    return path[::-1]
+
+
+# Queue comparison on random.dot: python sssp.py
+if __name__ == "__main__":
+    import time
+
+    from ex2 import Graph, GraphNode
+
+    graph = Graph()
+    graph.importFromFile("random.dot")
+    adjacency_list = graph.adjacency_list
+    sources = list(adjacency_list)
+    max_weight = max_edge_weight(adjacency_list)
+
+    def fastSP_no_skip(source):
+        # fastSP as first written: stale heap entries get relaxed again
+        distances = {key: float('inf') for key in adjacency_list}
+        distances[source] = 0
+        unvisited = [(0, source)]
+        while unvisited:
+            curr_dist, curr_node = heapq.heappop(unvisited)
+            for neighbor, weight in adjacency_list[curr_node]:
+                alt = curr_dist + weight
+                if alt < distances[neighbor]:
+                    distances[neighbor] = alt
+                    heapq.heappush(unvisited, (alt, neighbor))
+        return distances
+
+    runs = {
+        'slowSP': lambda s: graph.slowSP(GraphNode(s)),
+        'fastSP (old)': fastSP_no_skip,
+        'fastSP (heap)': lambda s: graph.fastSP(GraphNode(s)),
+        'dial': lambda s: dijkstra(adjacency_list, s, 'dial', max_weight),
+        'radix': lambda s: dijkstra(adjacency_list, s, 'radix'),
+    }
+    reference = {s: dijkstra(adjacency_list, s) for s in sources[:50]}
+    for name, run in runs.items():
+        subset = sources if name != 'slowSP' else sources[:100]
+        start = time.perf_counter()
+        for s in subset:
+            result = run(s)
+            if s in reference:
+                assert result == reference[s], name
+        per_query = (time.perf_counter() - start) / len(subset)
+        print(f"{name:>14}: {per_query * 1e3:7.3f} ms per source")
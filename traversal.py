@@ -0,0 +1,151 @@
+# traversal.py
+
+'''
+Iterative graph traversals as generators.
+
+Every traversal keeps its own explicit stack or queue, so path length is
+not limited by Python's recursion limit, and yields nodes one at a time:
+callers can stream them, stop early with a plain `break`, or materialise
+them with list().
+
+Traversals are written against a `neighbors(node)` function returning the
+neighbor labels of a node; list_neighbors() and matrix_neighbors() build
+one for the adjacency_list (Graph) and adjacency_matrix (Graph2) layouts.
+'''
+
+from collections import deque
+
+import instrument
+
+
+def list_neighbors(adjacency_list):
+    return lambda node: (neighbor for neighbor, _ in adjacency_list[node])
+
+
+def matrix_neighbors(adjacency_matrix):
+    return adjacency_matrix.__getitem__
+
+
+def iter_dfs(neighbors, start, order='pre', max_depth=None, visited=None, stats=None):
+    '''
+    Depth first traversal from start, visiting neighbors in the order
+    neighbors() returns them (the same order as the recursive Graph.dfs).
+
+    Args:
+        neighbors: function node -> iterable of neighbor nodes.
+        start: node to start from.
+        order: 'pre' yields a node when it is first reached, 'post' once all
+            of its descendants are done. Either way every node is yielded
+            exactly once; with max_depth, 'post' yields it when its first
+            expansion finishes (a node at the limit right away), so nodes
+            that only a later, shallower re-expansion reaches come after
+            it.
+        max_depth: nodes more than max_depth edges from start are not
+            visited (None for no limit). Depth is the shortest depth at
+            which the search reaches a node, not its depth in the first DFS
+            tree: a node first met deep down is expanded again when a
+            shallower path to it turns up, as iterative deepening would. It
+            is still yielded only once, and this costs at most max_depth
+            expansions per node.
+        visited: optional set shared between calls; nodes in it are skipped
+            and every visited node is added to it.
+        stats: optional instrument.Stats; once the traversal is exhausted
+            it holds nodes_visited plus the counts of a counting
+            neighbors() (see instrument.counting_neighbors).'''
+    if order not in ('pre', 'post'):
+        raise ValueError(f"unknown order {order!r}, expected 'pre' or 'post'")
+    if visited is None:
+        visited = set()
+    if stats is not None:
+        neighbors = instrument.counting_neighbors(neighbors, stats.counters)
+        stats.counters['nodes_visited'] = -len(visited)
+    preorder = order == 'pre'
+    visited.add(start)
+    if preorder or max_depth == 0:
+        yield start
+    if max_depth == 0:
+        if stats is not None:
+            stats.counters['nodes_visited'] += len(visited)
+        return
+    limited = max_depth is not None
+    depth = {start: 0}   # shallowest depth each node was reached at (limited only)
+    stack = [iter(neighbors(start))]
+    path = [start]
+    first = [True]       # whether each node on path is on its first expansion
+    while stack:
+        for neighbor in stack[-1]:
+            if neighbor not in visited:
+                break
+            # nodes from an earlier call are not in depth and stay skipped
+            if limited and len(path) < depth.get(neighbor, -1):
+                break
+        else:
+            stack.pop()
+            node = path.pop()
+            if first.pop() and not preorder:
+                yield node
+            continue
+        new = neighbor not in visited
+        if new:
+            visited.add(neighbor)
+            if preorder:
+                yield neighbor
+        if limited:
+            depth[neighbor] = len(path)
+            if len(path) >= max_depth:
+                # depth limit reached: treat neighbor as a leaf
+                if new and not preorder:
+                    yield neighbor
+                continue
+        path.append(neighbor)
+        first.append(new)
+        stack.append(iter(neighbors(neighbor)))
+    if stats is not None:
+        stats.counters['nodes_visited'] += len(visited)
+
+
+def iter_bfs(neighbors, start, max_depth=None, visited=None):
+    '''
+    Breadth first traversal from start; yields (node, depth) pairs in
+    order of increasing depth.'''
+    if visited is None:
+        visited = set()
+    visited.add(start)
+    queue = deque([(start, 0)])
+    while queue:
+        node, depth = queue.popleft()
+        yield node, depth
+        if max_depth is not None and depth >= max_depth:
+            continue
+        for neighbor in neighbors(node):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append((neighbor, depth + 1))
+
+
+# Depth-limited DFS check: python traversal.py
+if __name__ == "__main__":
+    # C is two edges from S through B, but the DFS meets B first at depth 2
+    # (S-A-B), where the limit stops it; it must be expanded again at depth 1
+    adjacency = {'S': ['A', 'B'], 'A': ['S', 'B'], 'B': ['A', 'C', 'S'], 'C': ['B']}
+    for order in ('pre', 'post'):
+        found = list(iter_dfs(adjacency.__getitem__, 'S', order, max_depth=2))
+        assert sorted(found) == ['A', 'B', 'C', 'S'] and len(found) == 4, (order, found)
+    assert sorted(iter_dfs(adjacency.__getitem__, 'S', max_depth=1)) == ['A', 'B', 'S']
+    # re-expanding a node must not yield it (or anything below it) twice
+    import random
+    for trial in range(2000):
+        rng = random.Random(trial)
+        n = rng.randint(2, 9)
+        adjacency = {i: [] for i in range(n)}
+        for _ in range(rng.randint(1, 20)):
+            u, v = rng.randrange(n), rng.randrange(n)
+            adjacency[u].append(v)
+            adjacency[v].append(u)
+        reached = {node for node, depth in iter_bfs(adjacency.__getitem__, 0, max_depth=3)}
+        for order in ('pre', 'post'):
+            found = list(iter_dfs(adjacency.__getitem__, 0, order, max_depth=3))
+            assert len(found) == len(set(found)) and set(found) == reached, (trial, order, found)
+    adjacency = {'S': ['A', 'B'], 'A': ['S', 'B'], 'B': ['A', 'C', 'S'], 'C': ['B']}
+    depths = dict(iter_bfs(adjacency.__getitem__, 'S'))
+    print("pre-order, depth 2:", list(iter_dfs(adjacency.__getitem__, 'S', max_depth=2)), "BFS depths:", depths)
@@ -0,0 +1,293 @@
+# vectorized.py
+
+'''
+Traversals and shortest paths over CSR arrays with NumPy.
+
+Graph.dfs and a weight-ignoring fastSP do one Python step per edge. Here a
+BFS expands a whole frontier per step instead: gather the neighbor slices
+of every frontier node out of targets in one fancy-indexing operation,
+keep the unvisited ones, and that is the next frontier. The Python loop
+runs once per level, not once per edge.
+
+    bfs_levels(graph, source)       node id arrays, one per BFS level
+    hop_distances(graph, sources)   edge count from the nearest source
+    connected_components(graph)     component id per node, by min-label
+                                    propagation with pointer jumping
+    delta_stepping(graph, source)   weighted distances, fastSP's results,
+                                    relaxing a whole bucket per step
+
+graph is a CSRGraph (the offsets/targets buffers are wrapped without
+copying) or any dict based lab graph, which is frozen into one first.
+Results are indexed by node id; graph.labels[i] is node i's label and
+graph.node_id(label) the reverse. NumPy is required.
+'''
+
+import numpy as np
+
+from csr import CSRGraph
+
+
+def csr_arrays(graph):
+    '''(graph, offsets, targets) with the CSR buffers as NumPy arrays.'''
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_graph(graph)
+    offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+    targets = np.frombuffer(graph.targets, dtype=np.int32)
+    return graph, offsets, targets
+
+
+def _source_ids(graph, sources):
+    if isinstance(sources, (str, int)) or hasattr(sources, 'data'):
+        sources = [sources]
+    return np.unique(np.fromiter((graph.node_id(source) for source in sources), dtype=np.int64))
+
+
+def _positions(offsets, frontier):
+    # edge positions (indices into targets/weights) of every frontier node's
+    # row, concatenated
+    starts = offsets[frontier]
+    counts = offsets[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    # output slot k reads position starts[j] + (k - first output slot of j)
+    shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return shift + np.arange(total)
+
+
+def _expand(offsets, targets, frontier):
+    # neighbor ids of every frontier node, concatenated
+    return targets[_positions(offsets, frontier)]
+
+
+def _levels(offsets, targets, n, sources, max_depth=None):
+    # yields (depth, frontier) and marks visited nodes in a bytemap
+    visited = np.zeros(n, dtype=bool)
+    visited[sources] = True
+    reached = np.zeros(n, dtype=bool)
+    frontier = sources
+    depth = 0
+    while frontier.size:
+        yield depth, frontier
+        if max_depth is not None and depth >= max_depth:
+            return
+        # dedup by scattering into a bytemap rather than np.unique: no sort,
+        # and flatnonzero hands the ids back in ascending order
+        reached[_expand(offsets, targets, frontier)] = True
+        reached &= ~visited
+        frontier = np.flatnonzero(reached)
+        visited |= reached
+        reached[frontier] = False
+        depth += 1
+
+
+def bfs_levels(graph, source, max_depth=None):
+    '''
+    Yields the BFS frontier of each level from source (a label, GraphNode
+    or several of them) as an ascending int64 array of node ids.'''
+    graph, offsets, targets = csr_arrays(graph)
+    for _, frontier in _levels(offsets, targets, len(graph), _source_ids(graph, source), max_depth):
+        yield frontier
+
+
+def hop_distances(graph, sources, max_depth=None):
+    '''
+    Number of edges from the nearest of sources to every node, as an int32
+    array indexed by node id (-1 where unreachable or beyond max_depth).'''
+    graph, offsets, targets = csr_arrays(graph)
+    dist = np.full(len(graph), -1, dtype=np.int32)
+    for depth, frontier in _levels(offsets, targets, len(graph), _source_ids(graph, sources), max_depth):
+        dist[frontier] = depth
+    return dist
+
+
+def reachable(graph, source):
+    '''Boolean array: True for node ids reachable from source.'''
+    return hop_distances(graph, source) >= 0
+
+
+def connected_components(graph):
+    '''
+    Component of every node of an undirected graph, as an int64 array where
+    each node holds the smallest node id of its component.
+
+    Every round takes, for each node, the minimum label among itself and
+    its neighbors (one np.minimum.reduceat over the CSR rows), then jumps
+    pointers (label = label[label]) until they settle, which collapses long
+    paths in a few rounds instead of one round per hop.'''
+    graph, offsets, targets = csr_arrays(graph)
+    n = len(graph)
+    label = np.arange(n, dtype=np.int64)
+    rows = np.flatnonzero(offsets[1:] > offsets[:-1])
+    if rows.size == 0:
+        return label
+    starts = offsets[rows]
+    while True:
+        neighbor_min = np.minimum.reduceat(label[targets], starts)
+        updated = label.copy()
+        updated[rows] = np.minimum(updated[rows], neighbor_min)
+        # a node's label is a node id; hooking that node to its own label
+        # propagates the minimum back along the chain
+        np.minimum.at(updated, label, updated)
+        while True:
+            jumped = updated[updated]
+            if np.array_equal(jumped, updated):
+                break
+            updated = jumped
+        if np.array_equal(updated, label):
+            return label
+        label = updated
+
+
+def component_count(graph):
+    labels = connected_components(graph)
+    return int(np.count_nonzero(labels == np.arange(len(labels))))
+
+
+# ---- weighted: delta-stepping ----
+
+def auto_delta(graph):
+    '''
+    Bucket width for delta_stepping: the largest weight over the average
+    degree (Meyer and Sanders' choice for random weights), but no less than
+    the smallest positive weight, so every bucket can hold a light edge.'''
+    graph, offsets, _ = csr_arrays(graph)
+    weights = np.asarray(graph.weights)
+    if weights.size == 0:
+        return 1.0
+    positive = weights[weights > 0]
+    if positive.size == 0:
+        return 1.0
+    degree = weights.size / max(1, int(np.count_nonzero(offsets[1:] > offsets[:-1])))
+    return float(max(positive.max() / degree, positive.min()))
+
+
+def _distinct(ids, mark):
+    # ids without duplicates, in ascending order, through the all-False
+    # bytemap mark (left all-False again); as in _levels, cheaper than np.unique
+    mark[ids] = True
+    ids = np.flatnonzero(mark)
+    mark[ids] = False
+    return ids
+
+
+def _relax(offsets, targets, weights, dist, frontier, edge_mask, mark):
+    # relaxes the masked edges out of frontier in bulk; returns the ids
+    # whose distance dropped, without duplicates
+    positions = _positions(offsets, frontier)
+    tails = np.repeat(frontier, offsets[frontier + 1] - offsets[frontier])
+    keep = edge_mask[positions]
+    positions, tails = positions[keep], tails[keep]
+    heads = targets[positions]
+    alt = dist[tails] + weights[positions]
+    better = alt < dist[heads]
+    heads, alt = heads[better], alt[better]
+    # several edges may hit one head: minimum.at keeps the smallest
+    np.minimum.at(dist, heads, alt)
+    return _distinct(heads, mark)
+
+
+def delta_stepping(graph, source, delta=None):
+    '''
+    Single-source shortest paths by delta-stepping; same distances as
+    fastSP, as a float64 array indexed by node id (inf if unreachable).
+
+    Tentative distances are grouped into buckets of width delta (auto_delta
+    if None). The lowest non-empty bucket is settled by relaxing the light
+    edges (weight <= delta) of all its nodes at once, repeating for nodes
+    that fall back into the bucket, and then relaxing their heavy edges
+    once. Each of those steps is one vectorized pass over the frontier's
+    edges, so the Python loop runs per bucket phase instead of per edge.
+    Weights must be non-negative.'''
+    graph, offsets, targets = csr_arrays(graph)
+    weights = np.asarray(graph.weights, dtype=np.float64)
+    if weights.size and weights.min() < 0:
+        raise ValueError("delta-stepping needs non-negative weights")
+    delta = auto_delta(graph) if delta is None else float(delta)
+    if delta <= 0:
+        raise ValueError("delta must be positive")
+    light = weights <= delta
+    heavy = ~light
+
+    dist = np.full(len(graph), np.inf)
+    mark = np.zeros(len(graph), dtype=bool)
+    done = np.zeros(len(graph), dtype=bool)
+    source = graph.node_id(source)
+    dist[source] = 0
+    pending = np.array([source], dtype=np.int64)   # reached, not yet settled
+    while pending.size:
+        # compare integer bucket indices rather than distances against a
+        # bound like (index + 1) * delta, which rounding can pull down to
+        # the lowest distance itself and leave the bucket empty
+        index = np.floor(dist[pending] / delta)
+        current = index.min()
+        in_bucket = index == current
+        bucket, pending = pending[in_bucket], [pending[~in_bucket]]
+        settled = [bucket]
+        while bucket.size:
+            improved = _relax(offsets, targets, weights, dist, bucket, light, mark)
+            in_bucket = np.floor(dist[improved] / delta) <= current
+            bucket = improved[in_bucket]
+            settled.append(bucket)
+            pending.append(improved[~in_bucket])
+        settled = _distinct(np.concatenate(settled), mark)
+        done[settled] = True
+        pending.append(_relax(offsets, targets, weights, dist, settled, heavy, mark))
+        # nodes improved twice show up twice; ones improved into this
+        # bucket have been settled with it
+        pending = np.concatenate(pending)
+        pending = _distinct(pending[~done[pending]], mark)
+    return dist
+
+
+# Vectorized vs. pure Python on a large random graph:
+# python vectorized.py [nodes] [average degree]
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from disjointset import DisjointSet
+    from generators import edge_probability, erdos_renyi
+    from traversal import iter_bfs
+
+    # regression: 22 / delta rounds to 5.999..., and the bucket bound
+    # (5 + 1) * delta to 22.0 itself, which once left the bucket empty forever
+    tiny = CSRGraph.from_edges([('a', 'b', 22)])
+    assert delta_stepping(tiny, 'a', 3.666666666666667).tolist() == [0, 22]
+    for trial in range(500):
+        small = CSRGraph.from_edges(erdos_renyi(40, 0.1, trial))
+        if len(small):
+            assert delta_stepping(small, small.labels[0]).tolist() == small.distances(0), trial
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    degree = float(sys.argv[2]) if len(sys.argv) > 2 else 8
+    graph = CSRGraph.from_edges(erdos_renyi(n, edge_probability(n, degree), 338))
+    print(f"{len(graph)} nodes, {graph.num_edges()} edges")
+    source = graph.labels[0]
+
+    def timed(function):
+        start = time.perf_counter()
+        result = function()
+        return result, time.perf_counter() - start
+
+    labels, offsets, targets = graph.labels, graph.offsets, graph.targets
+    neighbors = lambda i: targets[offsets[i]:offsets[i + 1]]
+    py_hops, t_py = timed(lambda: dict(iter_bfs(neighbors, 0)))
+    np_hops, t_np = timed(lambda: hop_distances(graph, source))
+    assert all(np_hops[i] == d for i, d in py_hops.items()) and int((np_hops >= 0).sum()) == len(py_hops)
+    print(f"hop distances:  python BFS {t_py:7.3f} s  numpy {t_np:7.3f} s  ({t_py / t_np:5.1f}x)")
+
+    def python_components():
+        sets = DisjointSet(len(labels))
+        sets.union_many((u, targets[k]) for u in range(len(labels)) for k in range(offsets[u], offsets[u + 1]))
+        return sets.count
+    py_count, t_py = timed(python_components)
+    np_count, t_np = timed(lambda: component_count(graph))
+    assert py_count == np_count, (py_count, np_count)
+    print(f"components:     union-find {t_py:7.3f} s  numpy {t_np:7.3f} s  ({t_py / t_np:5.1f}x), {np_count} components")
+
+    py_dist, t_py = timed(lambda: graph.distances(0))
+    delta = auto_delta(graph)
+    np_dist, t_np = timed(lambda: delta_stepping(graph, source, delta))
+    assert np_dist.tolist() == py_dist
+    print(f"shortest paths: dijkstra {t_py:7.3f} s  delta-stepping {t_np:7.3f} s  ({t_py / t_np:5.1f}x), delta {delta:g}")